@@ -3,10 +3,108 @@ Alerts module for Forex Watchlist application.
 Handles alert checking and desktop notifications.
 """
 
+import atexit
+import json
 import platform
+import shutil
 import subprocess
-from rates import get_rate
-from watchlist import update_rate
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from alerts_index import AlertIndex
+from rates import get_rates_bulk
+from watchlist import ALERT_CMPS, update_rates
+
+# Cap concurrent fetches to stay under provider rate limits
+MAX_FETCH_WORKERS = 6
+
+# Notifications are fire-and-forget: dispatching them off-thread keeps the
+# alert check from blocking on process spawn / Notification Center IPC
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=2)
+
+# Resolve the platform and notifier tool paths once at import time so each
+# notification skips the uname syscall, if/elif chain, and PATH lookup
+_SYSTEM = platform.system()
+_OSASCRIPT = shutil.which("osascript") if _SYSTEM == "Darwin" else None
+_NOTIFY_SEND = shutil.which("notify-send") if _SYSTEM == "Linux" else None
+
+
+# Long-lived interactive osascript process; one pipe write per notification
+# amortizes the interpreter startup across a whole batch
+_OSA_PROC = None
+
+
+def _escape_osa(text):
+    """Escape text for an AppleScript double-quoted string literal."""
+    return json.dumps(str(text))[1:-1]
+
+
+def _osa_process():
+    """Lazily start (or restart after exit) the osascript interpreter."""
+    global _OSA_PROC
+    if _OSA_PROC is None or _OSA_PROC.poll() is not None:
+        _OSA_PROC = subprocess.Popen(
+            [_OSASCRIPT or "osascript", "-i"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    return _OSA_PROC
+
+
+def _close_osa_process():
+    if _OSA_PROC is not None and _OSA_PROC.poll() is None:
+        try:
+            _OSA_PROC.stdin.close()
+            _OSA_PROC.terminate()
+        except Exception:
+            pass
+
+
+atexit.register(_close_osa_process)
+
+
+def _notify_mac(title, message):
+    # macOS - feed the long-lived osascript interpreter one line per
+    # notification; quotes in the text are escaped so they can't break
+    # out of the AppleScript string literal
+    script = 'display notification "{}" with title "{}"\n'.format(
+        _escape_osa(message), _escape_osa(title))
+    try:
+        proc = _osa_process()
+        proc.stdin.write(script.encode())
+        proc.stdin.flush()
+    except Exception:
+        # Broken pipe etc. - fall back to a one-shot invocation
+        subprocess.Popen([_OSASCRIPT or "osascript", "-e", script.strip()],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _notify_linux(title, message):
+    # Linux - use notify-send if available
+    subprocess.Popen([_NOTIFY_SEND or "notify-send", title, message],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _notify_windows(title, message):
+    # Windows - try plyer
+    from plyer import notification
+    notification.notify(
+        title=title,
+        message=message,
+        app_name="Forex Watchlist",
+        timeout=10
+    )
+
+
+def _notify_console(title, message):
+    print(f"[ALERT] {title}: {message}")
+
+
+_NOTIFY = {
+    "Darwin": _notify_mac,
+    "Linux": _notify_linux,
+    "Windows": _notify_windows,
+}.get(_SYSTEM, _notify_console)
 
 
 def send_notification(title, message):
@@ -17,31 +115,16 @@ def send_notification(title, message):
         title (str): Notification title
         message (str): Notification body text
     """
-    system = platform.system()
-
     try:
-        if system == "Darwin":
-            # macOS - use osascript for reliable notifications
-            script = f'display notification "{message}" with title "{title}"'
-            subprocess.run(["osascript", "-e", script], check=True)
-        elif system == "Linux":
-            # Linux - use notify-send if available
-            subprocess.run(["notify-send", title, message], check=True)
-        elif system == "Windows":
-            # Windows - try plyer
-            from plyer import notification
-            notification.notify(
-                title=title,
-                message=message,
-                app_name="Forex Watchlist",
-                timeout=10
-            )
-        else:
-            # Fallback to console
-            print(f"[ALERT] {title}: {message}")
+        _NOTIFY(title, message)
     except Exception:
         # Fallback to console if notification fails
-        print(f"[ALERT] {title}: {message}")
+        _notify_console(title, message)
+
+
+def notify_async(title, message):
+    """Dispatch a desktop notification on the background pool."""
+    _NOTIFY_POOL.submit(send_notification, title, message)
 
 
 def format_alert_message(pair, alert, current_rate):
@@ -68,6 +151,9 @@ def check_alert_triggered(alert, current_rate):
     """
     Check if an alert condition is met.
 
+    Alerts loaded through list_pairs carry a pre-resolved '_cmp'
+    comparator; the type lookup only runs for undecorated alerts.
+
     Args:
         alert (dict): Alert configuration
         current_rate (float): Current exchange rate
@@ -75,11 +161,10 @@ def check_alert_triggered(alert, current_rate):
     Returns:
         bool: True if alert triggered
     """
-    if alert['type'] == 'above':
-        return current_rate >= alert['target']
-    elif alert['type'] == 'below':
-        return current_rate <= alert['target']
-    return False
+    compare = alert.get('_cmp') or ALERT_CMPS.get(alert['type'])
+    if compare is None:
+        return False
+    return compare(current_rate, alert['target'])
 
 
 def check_alerts(pairs):
@@ -94,33 +179,56 @@ def check_alerts(pairs):
     """
     triggered = []
 
-    for pair in pairs:
-        if not pair['alerts']:
-            continue
-
-        # Fetch current rate
-        current_rate = get_rate(pair['base'], pair['quote'])
+    # Group pairs by base currency so every group resolves with at most one
+    # fallback HTTP call, then fetch the groups concurrently - the work is
+    # network-bound, so this collapses N round-trips into roughly one
+    active = [pair for pair in pairs if pair['alerts']]
+    by_base = {}
+    for pair in active:
+        by_base.setdefault(pair['base'], []).append(pair)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        futures = {
+            executor.submit(get_rates_bulk, base, [p['quote'] for p in group]): group
+            for base, group in by_base.items()
+        }
+        for future in as_completed(futures):
+            group = futures[future]
+            rates = future.result()
+            for pair in group:
+                results.append((pair, rates.get(pair['quote'])))
+
+    rate_lookup = {}
+    for pair, current_rate in results:
         if current_rate is None:
             print(f"Could not fetch rate for {pair['base']}/{pair['quote']}")
             continue
 
-        # Update stored rate
-        update_rate(pair['base'], pair['quote'], current_rate)
-
-        # Check each alert
-        for alert in pair['alerts']:
-            if check_alert_triggered(alert, current_rate):
-                message = format_alert_message(pair, alert, current_rate)
-                title = f"Forex Alert: {pair['base']}/{pair['quote']}"
-
-                # Send notification
-                send_notification(title, message)
-
-                triggered.append({
-                    'pair': f"{pair['base']}/{pair['quote']}",
-                    'alert': alert,
-                    'current_rate': current_rate,
-                    'message': message
-                })
+        rate_lookup[(pair['base'], pair['quote'])] = current_rate
+
+    # Persist all fetched rates with a single load/save round-trip
+    update_rates(rate_lookup)
+
+    # Evaluate all alerts in one vectorized pass instead of a Python loop
+    # per alert
+    index = AlertIndex(active)
+    messages_by_pair = {}
+    for pair, alert, current_rate in index.triggered(rate_lookup):
+        message = format_alert_message(pair, alert, current_rate)
+        pair_key = f"{pair['base']}/{pair['quote']}"
+        messages_by_pair.setdefault(pair_key, []).append(message)
+
+        triggered.append({
+            'pair': pair_key,
+            'alert': alert,
+            'current_rate': current_rate,
+            'message': message
+        })
+
+    # One notification per pair amortizes the subprocess startup cost over
+    # all of that pair's alerts
+    for pair_key, messages in messages_by_pair.items():
+        notify_async(f"Forex Alert: {pair_key}", "\n".join(messages))
 
     return triggered
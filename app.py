@@ -6,14 +6,22 @@ price alerts. Uses TradingView data from OANDA broker.
 No API key required.
 """
 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
-from storage import load_watchlist, save_watchlist
-from rates import get_rate, get_rate_with_details, get_available_currencies, get_tradingview_symbol, FOREX_PAIRS
+from rates import get_rate, get_rate_with_details, get_available_currencies
 from watchlist import add_pair, remove_pair, add_alert, remove_alert, list_pairs
-from alerts import check_alert_triggered
-from journal import add_trade, delete_trade, get_all_trades, get_journal_stats
-from portfolio import open_position, close_position, get_all_positions, calculate_pips, get_portfolio_summary
+from alerts_index import AlertIndex
+from journal import JOURNAL_FILE, add_trade, delete_trade, get_all_trades, get_journal_stats
+from portfolio import open_position, close_position, get_all_positions, calculate_pips_bulk, get_portfolio_summary
+
+# Minimum seconds between manual alert checks, so spam-clicking the check
+# button can't burn through the provider's free-tier quota
+MIN_CHECK_INTERVAL = int(os.environ.get("FX_MIN_CHECK_SEC", "30"))
 
 # Page config
 st.set_page_config(
@@ -26,34 +34,119 @@ st.title("💱 Forex Watchlist & Alerts")
 st.caption("Real-time forex data from TradingView (OANDA) - No API key required")
 
 
-def tradingview_widget(symbol, height=400):
-    """Embed TradingView mini chart widget."""
-    widget_html = f'''
+# Cache rates across reruns so tab switches and button clicks don't each
+# pay a network round-trip per pair. Failed fetches raise inside the cached
+# function so a transient None isn't pinned for the whole TTL window.
+@st.cache_data(ttl=15, show_spinner=False)
+def _fetch_rate(base, quote):
+    rate = get_rate(base, quote)
+    if rate is None:
+        raise RuntimeError(f"No rate for {base}/{quote}")
+    return rate
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _fetch_details(base, quote):
+    details = get_rate_with_details(base, quote)
+    if details is None:
+        raise RuntimeError(f"No details for {base}/{quote}")
+    return details
+
+
+def _cached_rate(base, quote):
+    """Cached get_rate; returns None on fetch failure without caching it."""
+    try:
+        return _fetch_rate(base, quote)
+    except Exception:
+        return None
+
+
+def _cached_details(base, quote):
+    """Cached get_rate_with_details; failures are not cached."""
+    try:
+        return _fetch_details(base, quote)
+    except Exception:
+        return None
+
+
+# The pair list changes at most between releases, so build the selectbox
+# options and display labels once instead of on every rerun
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def _pair_choices():
+    currencies = get_available_currencies()
+    keys = list(currencies.keys())
+    labels = {key: f"{key} - {currencies[key][1]}" for key in keys}
+    return keys, labels
+
+
+# Skip the JSON file read on most reruns; mutations clear this so the UI
+# never shows a stale watchlist
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_pairs():
+    return list_pairs()
+
+
+# The widget markup only varies by symbol and height, so keep one template
+# at module scope and fill the placeholders per pair; identical payloads
+# also let Streamlit short-circuit re-rendering the component
+_TV_WIDGET_TEMPLATE = '''
     <!-- TradingView Widget BEGIN -->
     <div class="tradingview-widget-container">
       <div class="tradingview-widget-container__widget"></div>
       <script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-mini-symbol-overview.js" async>
-      {{
-        "symbol": "{symbol}",
+      {
+        "symbol": "{{SYMBOL}}",
         "width": "100%",
-        "height": "{height}",
+        "height": "{{HEIGHT}}",
         "locale": "en",
         "dateRange": "1D",
         "colorTheme": "light",
         "isTransparent": false,
         "autosize": true,
         "largeChartUrl": ""
-      }}
+      }
       </script>
     </div>
     <!-- TradingView Widget END -->
     '''
-    components.html(widget_html, height=height + 20)
 
 
-def tradingview_ticker():
-    """Embed TradingView ticker tape widget."""
-    widget_html = '''
+@st.cache_data(ttl=3600, show_spinner=False)
+def _tv_html(symbol, height):
+    """Build (and cache) the widget HTML for one symbol/height."""
+    return (_TV_WIDGET_TEMPLATE
+            .replace("{{SYMBOL}}", symbol)
+            .replace("{{HEIGHT}}", str(height)))
+
+
+def tradingview_widget(symbol, height=400):
+    """Embed TradingView mini chart widget."""
+    components.html(_tv_html(symbol, height), height=height + 20)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _tv_multi_html(symbols, height):
+    """
+    Build one HTML document holding a widget per symbol.
+
+    All widgets share a single iframe, so the browser parses and
+    initializes TradingView's embed bundle once instead of once per
+    chart.
+    """
+    return "\n".join(_tv_html(symbol, height) for symbol in symbols)
+
+
+def tradingview_widgets(symbols, height=300):
+    """Embed several mini chart widgets in a single iframe."""
+    components.html(
+        _tv_multi_html(tuple(symbols), height),
+        height=(height + 20) * len(symbols)
+    )
+
+
+# The ticker tape never varies, so build its markup once at import time
+# instead of on every script rerun
+_TV_TICKER_HTML = '''
     <!-- TradingView Widget BEGIN -->
     <div class="tradingview-widget-container">
       <div class="tradingview-widget-container__widget"></div>
@@ -77,7 +170,11 @@ def tradingview_ticker():
     </div>
     <!-- TradingView Widget END -->
     '''
-    components.html(widget_html, height=80)
+
+
+def tradingview_ticker():
+    """Embed TradingView ticker tape widget."""
+    components.html(_TV_TICKER_HTML, height=80)
 
 
 # Show ticker tape at top
@@ -87,16 +184,17 @@ tradingview_ticker()
 st.sidebar.header("Add Currency Pair")
 
 # Get available pairs
-available_pairs = list(FOREX_PAIRS.keys())
+available_pairs, pair_labels = _pair_choices()
 selected_pair_to_add = st.sidebar.selectbox(
     "Select Pair",
     available_pairs,
-    format_func=lambda x: f"{x} - {FOREX_PAIRS[x][1]}"
+    format_func=pair_labels.get
 )
 
 if st.sidebar.button("Add to Watchlist", type="primary", use_container_width=True):
     base, quote = selected_pair_to_add.split("/")
     if add_pair(base, quote):
+        _cached_pairs.clear()
         st.sidebar.success(f"Added {selected_pair_to_add}")
         st.rerun()
     else:
@@ -106,16 +204,16 @@ if st.sidebar.button("Add to Watchlist", type="primary", use_container_width=Tru
 st.sidebar.divider()
 st.sidebar.header("Set Alert")
 
-pairs = list_pairs()
+pairs = _cached_pairs()
 if pairs:
-    pair_options = [f"{p['base']}/{p['quote']}" for p in pairs]
+    pair_options = [p['_name'] for p in pairs]
     selected_pair = st.sidebar.selectbox("Currency Pair", pair_options)
 
     if selected_pair:
         base_alert, quote_alert = selected_pair.split("/")
 
         # Get current rate for reference
-        current = get_rate(base_alert, quote_alert)
+        current = _cached_rate(base_alert, quote_alert)
         if current:
             st.sidebar.caption(f"Current rate: {current:.5f}")
 
@@ -131,11 +229,52 @@ if pairs:
 
         if st.sidebar.button("Set Alert", use_container_width=True):
             if add_alert(base_alert, quote_alert, alert_type, target, note):
+                _cached_pairs.clear()
                 st.sidebar.success(f"Alert set: {selected_pair} {alert_type} {target:.5f}")
                 st.rerun()
 else:
     st.sidebar.info("Add a currency pair first")
 
+# Resolve every pair's detail lookup in one batched parallel pass and share
+# the result across every tab (and the alert check) that needs rates. The
+# batch itself is cached on the pair set, so reruns inside the TTL reuse it
+# without even touching the per-pair caches.
+class _PartialBatch(Exception):
+    """Carries a batch with failed pairs out of the cached function, so
+    st.cache_data doesn't pin the Nones for the whole TTL window."""
+
+    def __init__(self, details_map):
+        self.details_map = details_map
+
+
+def _build_details_map(pair_keys):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return dict(zip(
+            pair_keys,
+            pool.map(lambda key: _cached_details(*key), pair_keys)
+        ))
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def _fetch_all_details(pair_keys):
+    details_map = _build_details_map(pair_keys)
+    if any(details is None for details in details_map.values()):
+        raise _PartialBatch(details_map)
+    return details_map
+
+
+if pairs:
+    try:
+        details_map = _fetch_all_details(
+            tuple(sorted((pair['base'], pair['quote']) for pair in pairs))
+        )
+    except _PartialBatch as e:
+        # This run still renders what it got; the next rerun retries
+        # only the failures - successes stay in the per-pair caches
+        details_map = e.details_map
+else:
+    details_map = {}
+
 # Main content
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Watchlist & Charts", "🔔 Check Alerts", "💰 Live Rates", "📓 Trade Journal", "💼 Portfolio"])
 
@@ -149,23 +288,30 @@ with tab1:
         st.subheader("Example: EUR/USD")
         tradingview_widget("OANDA:EURUSD", 350)
     else:
+        # Toggled-on charts are collected and rendered together in one
+        # iframe below the list, so TradingView's embed script is parsed
+        # and initialized once however many charts are open
+        chart_symbols = []
         for pair in pairs:
-            pair_name = f"{pair['base']}/{pair['quote']}"
-            tv_symbol = get_tradingview_symbol(pair['base'], pair['quote'])
+            pair_name = pair['_name']
+            tv_symbol = pair['_tv']
 
-            with st.expander(f"**{pair_name}**", expanded=True):
+            with st.expander(f"**{pair_name}**", expanded=False):
                 col1, col2 = st.columns([2, 1])
 
                 with col1:
-                    # Show TradingView chart
+                    # Charts are loaded on demand: every embedded widget
+                    # pulls TradingView's JS bundle, so eagerly rendering
+                    # one per pair dominates initial page load
                     if tv_symbol:
-                        tradingview_widget(tv_symbol, 300)
+                        if st.toggle("Show chart", key=f"chart_{pair_name}"):
+                            chart_symbols.append(tv_symbol)
                     else:
                         st.warning("Chart not available for this pair")
 
                 with col2:
                     # Show rate details
-                    details = get_rate_with_details(pair['base'], pair['quote'])
+                    details = details_map.get((pair['base'], pair['quote']))
                     if details:
                         st.metric(
                             "Current Price",
@@ -174,6 +320,12 @@ with tab1:
                         )
                         st.caption(f"High: {details['high']:.5f} | Low: {details['low']:.5f}")
                         st.caption(f"Signal: {details['recommendation']}")
+                    elif pair.get('last_rate'):
+                        # Stale-while-revalidate: paint the stored rate now
+                        # rather than blocking on (or hiding) a slow fetch;
+                        # the next rerun picks up the live value
+                        st.metric("Current Price", f"{pair['last_rate']:.5f}")
+                        st.caption("Last stored rate - live fetch pending")
                     else:
                         st.warning("Could not fetch rate")
 
@@ -189,6 +341,7 @@ with tab1:
                             with col_b:
                                 if st.button("🗑️", key=f"del_alert_{pair_name}_{i}"):
                                     remove_alert(pair['base'], pair['quote'], i)
+                                    _cached_pairs.clear()
                                     st.rerun()
                     else:
                         st.caption("No alerts set")
@@ -196,8 +349,13 @@ with tab1:
                     st.divider()
                     if st.button("Remove Pair", key=f"del_{pair_name}", type="secondary"):
                         remove_pair(pair['base'], pair['quote'])
+                        _cached_pairs.clear()
                         st.rerun()
 
+        if chart_symbols:
+            st.subheader("Charts")
+            tradingview_widgets(chart_symbols, 300)
+
 with tab2:
     st.header("Check Alerts")
 
@@ -207,10 +365,10 @@ with tab2:
         # Auto-monitor toggle
         col_monitor1, col_monitor2 = st.columns([1, 2])
         with col_monitor1:
-            auto_monitor = st.toggle("Auto-Monitor", value=False, help="Automatically check alerts every 30 seconds")
+            auto_monitor = st.toggle("Auto-Monitor", value=False, help="Automatically check alerts; the interval adapts to market activity")
         with col_monitor2:
             if auto_monitor:
-                st.caption("🟢 Monitoring active - checking every 30 seconds")
+                st.caption("🟢 Monitoring active - interval adapts to rate movement")
 
         # Browser notification permission request
         if auto_monitor:
@@ -225,34 +383,50 @@ with tab2:
 
         # Check alerts function
         def check_all_alerts():
-            triggered = []
+            # Rates come from the batch prefetched at the top of the script,
+            # so checking alerts costs no extra network round-trips
+            active = [p for p in pairs if p['alerts']]
+            rate_lookup = {}
             checked = 0
-
-            for pair in pairs:
-                if not pair['alerts']:
-                    continue
-
-                rate = get_rate(pair['base'], pair['quote'])
+            for pair in active:
+                details = details_map.get((pair['base'], pair['quote']))
+                rate = details['close'] if details else \
+                    _cached_rate(pair['base'], pair['quote'])
                 if rate is None:
                     continue
-
+                rate_lookup[(pair['base'], pair['quote'])] = rate
                 checked += len(pair['alerts'])
 
-                for alert in pair['alerts']:
-                    if check_alert_triggered(alert, rate):
-                        triggered.append({
-                            'pair': f"{pair['base']}/{pair['quote']}",
-                            'type': alert['type'],
-                            'target': alert['target'],
-                            'rate': rate,
-                            'note': alert.get('note', '')
-                        })
+            # Same vectorized comparison path the CLI checker uses
+            triggered = [
+                {
+                    'pair': pair['_name'],
+                    'type': alert['type'],
+                    'target': alert['target'],
+                    'rate': rate,
+                    'note': alert.get('note', '')
+                }
+                for pair, alert, rate in AlertIndex(active).triggered(rate_lookup)
+            ]
             return triggered, checked
 
-        # Manual check button
+        # Manual check button, rate-limited so repeated clicks inside the
+        # window reuse the previous result instead of refetching
         if st.button("🔔 Check All Alerts Now", type="primary"):
-            with st.spinner("Checking alerts..."):
-                triggered, checked = check_all_alerts()
+            now = time.time()
+            last_check = st.session_state.get("last_check", 0)
+            if now - last_check < MIN_CHECK_INTERVAL:
+                remaining = int(MIN_CHECK_INTERVAL - (now - last_check))
+                st.warning(
+                    f"Checked {int(now - last_check)}s ago - "
+                    f"showing those results (next check in {remaining}s)"
+                )
+                triggered, checked = st.session_state.get("last_check_result", ([], 0))
+            else:
+                st.session_state["last_check"] = now
+                with st.spinner("Checking alerts..."):
+                    triggered, checked = check_all_alerts()
+                st.session_state["last_check_result"] = (triggered, checked)
 
             if triggered:
                 st.success(f"🚨 {len(triggered)} alert(s) triggered!")
@@ -278,13 +452,40 @@ with tab2:
             else:
                 st.info(f"No alerts triggered. Checked {checked} alert(s).")
 
+        # Volatility-adaptive poll cadence: keep an EMA of the mean
+        # relative rate move per cycle and poll faster when the market is
+        # active, slower when it is quiet
+        def adaptive_interval_ms(base_ms=30000):
+            prev_rates = st.session_state.get("monitor_rates", {})
+            volatility = st.session_state.get("volatility", 0.0)
+
+            current_rates = {}
+            deltas = []
+            for pair_key, details in details_map.items():
+                if not details or not details.get('close'):
+                    continue
+                rate = details['close']
+                current_rates[pair_key] = rate
+                previous = prev_rates.get(pair_key)
+                if previous:
+                    deltas.append(abs(rate - previous) / previous)
+
+            if deltas:
+                volatility = 0.7 * volatility + 0.3 * (sum(deltas) / len(deltas))
+            st.session_state["volatility"] = volatility
+            st.session_state["monitor_rates"] = current_rates
+
+            # A 0.01% mean move halves the interval; clamp to 5s-120s
+            interval = base_ms / (1.0 + volatility / 0.0001)
+            return int(min(max(interval, 5000), 120000))
+
         # Auto-refresh if monitoring is enabled
         if auto_monitor:
-            import time
             from streamlit_autorefresh import st_autorefresh
 
-            # Refresh every 30 seconds
-            count = st_autorefresh(interval=30000, limit=None, key="alert_monitor")
+            interval_ms = adaptive_interval_ms()
+            st.caption(f"Next check in ~{interval_ms // 1000}s (adaptive)")
+            count = st_autorefresh(interval=interval_ms, limit=None, key="alert_monitor")
 
             if count > 0:
                 triggered, checked = check_all_alerts()
@@ -319,7 +520,7 @@ with tab2:
 
         for pair in pairs:
             if pair['alerts']:
-                st.write(f"**{pair['base']}/{pair['quote']}**: {len(pair['alerts'])} alert(s)")
+                st.write(f"**{pair['_name']}**: {len(pair['alerts'])} alert(s)")
                 for alert in pair['alerts']:
                     icon = "📈" if alert['type'] == 'above' else "📉"
                     st.caption(f"  {icon} {alert['type']} {alert['target']:.5f}")
@@ -341,24 +542,38 @@ with tab3:
     if not pairs:
         st.info("Add currency pairs to see their rates.")
     else:
-        # Create grid of rate cards
-        cols = st.columns(min(len(pairs), 3))
-
-        for i, pair in enumerate(pairs):
-            with cols[i % 3]:
-                details = get_rate_with_details(pair['base'], pair['quote'])
-                if details:
-                    delta_color = "normal"
-                    st.metric(
-                        label=f"{pair['base']}/{pair['quote']}",
-                        value=f"{details['close']:.5f}",
-                        delta=f"{details['change_pct']:.3f}%" if details.get('change_pct') else None
-                    )
-                    st.caption(f"H: {details['high']:.5f} | L: {details['low']:.5f}")
-                else:
-                    st.error(f"{pair['base']}/{pair['quote']}: Error")
+        # One table widget instead of three widgets per pair, so frontend
+        # work stays flat as the watchlist grows
+        rows = []
+        for pair in pairs:
+            details = details_map.get((pair['base'], pair['quote']))
+            rows.append({
+                "Pair": pair['_name'],
+                # Fall back to the stored rate so a failed fetch still
+                # shows the last known price instead of a hole
+                "Price": details['close'] if details else pair.get('last_rate'),
+                "Change %": details['change_pct'] if details else None,
+                "High": details['high'] if details else None,
+                "Low": details['low'] if details else None,
+                "Signal": details['recommendation'] if details else
+                          ("Cached" if pair.get('last_rate') else "Error"),
+            })
+
+        rates_df = pd.DataFrame(rows)
+        st.dataframe(
+            rates_df.style.format(
+                {"Price": "{:.5f}", "Change %": "{:+.3f}%",
+                 "High": "{:.5f}", "Low": "{:.5f}"},
+                na_rep="-"
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
 
         if st.button("🔄 Refresh Rates"):
+            _fetch_rate.clear()
+            _fetch_details.clear()
+            _fetch_all_details.clear()
             st.rerun()
 
 with tab5:
@@ -394,16 +609,16 @@ with tab5:
     if positions:
         st.divider()
 
-        # Calculate pips for each position using live rates
-        positions_with_pips = []
-        for pos in positions:
-            base, quote = pos["pair"].split("/")
-            current_rate = get_rate(base, quote)
-            if current_rate:
-                pips = calculate_pips(pos["pair"], pos["direction"], pos["entry_price"], current_rate)
-                positions_with_pips.append((pos, pips, current_rate))
-            else:
-                positions_with_pips.append((pos, 0, None))
+        # Fetch each distinct pair once; several positions often share one
+        rate_lookup = {}
+        for pair_name in {pos["pair"] for pos in positions}:
+            base, quote = pair_name.split("/")
+            rate_lookup[pair_name] = _cached_rate(base, quote)
+
+        # One vectorized pips pass over all positions
+        current_rates = [rate_lookup[pos["pair"]] for pos in positions]
+        all_pips = calculate_pips_bulk(positions, current_rates)
+        positions_with_pips = list(zip(positions, all_pips, current_rates))
 
         # Portfolio summary
         summary = get_portfolio_summary([(p, pips) for p, pips, _ in positions_with_pips])
@@ -451,6 +666,9 @@ with tab5:
                 st.divider()
 
         if st.button("Refresh Prices"):
+            _fetch_rate.clear()
+            _fetch_details.clear()
+            _fetch_all_details.clear()
             st.rerun()
     else:
         st.info("No open positions. Use the form above to track a position.")
@@ -475,14 +693,21 @@ with tab4:
         submitted = st.form_submit_button("Log Trade", type="primary", use_container_width=True)
         if submitted:
             trade = add_trade(trade_pair, trade_direction, trade_entry, trade_exit, trade_lots, trade_notes)
-            pips = trade["pips"]
+            pips = trade.pips
             emoji = "+" if pips > 0 else ""
             st.success(f"Trade logged: {trade_pair} {trade_direction} | {emoji}{pips} pips")
             st.rerun()
 
     # Trading stats
     st.divider()
-    stats = get_journal_stats()
+
+    @st.cache_data
+    def _journal_stats(mtime):
+        # mtime keys the cache: stats recompute only when the log changes
+        return get_journal_stats()
+
+    journal_mtime = os.path.getmtime(JOURNAL_FILE) if os.path.exists(JOURNAL_FILE) else 0
+    stats = _journal_stats(journal_mtime)
 
     if stats["total_trades"] > 0:
         st.subheader("Performance Stats")
@@ -517,26 +742,26 @@ with tab4:
         st.info("No trades logged yet. Use the form above to log your first trade.")
     else:
         for trade in trades:
-            pips = trade["pips"]
+            pips = trade.pips
             color = "green" if pips > 0 else "red"
             icon = "W" if pips > 0 else "L"
-            direction_icon = "Long" if trade["direction"] == "BUY" else "Short"
+            direction_icon = "Long" if trade.direction == "BUY" else "Short"
 
             with st.container():
                 c1, c2, c3, c4 = st.columns([2, 2, 1, 1])
                 with c1:
-                    st.markdown(f"**{trade['pair']}** - {direction_icon}")
-                    st.caption(f"{trade['date']}")
+                    st.markdown(f"**{trade.pair}** - {direction_icon}")
+                    st.caption(f"{trade.date}")
                 with c2:
-                    st.caption(f"Entry: {trade['entry_price']:.5f} | Exit: {trade['exit_price']:.5f}")
-                    if trade.get("notes"):
-                        st.caption(f"Notes: {trade['notes']}")
+                    st.caption(f"Entry: {trade.entry_price:.5f} | Exit: {trade.exit_price:.5f}")
+                    if trade.notes:
+                        st.caption(f"Notes: {trade.notes}")
                 with c3:
                     st.markdown(f":{color}[**{pips:+.1f} pips**]")
-                    st.caption(f"{trade['lot_size']} lots")
+                    st.caption(f"{trade.lot_size} lots")
                 with c4:
-                    if st.button("Delete", key=f"del_trade_{trade['id']}"):
-                        delete_trade(trade["id"])
+                    if st.button("Delete", key=f"del_trade_{trade.id}"):
+                        delete_trade(trade.id)
                         st.rerun()
                 st.divider()
 
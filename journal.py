@@ -1,37 +1,137 @@
 """
 Trade Journal module for Forex Watchlist.
 Handles logging, storing, and analyzing past trades.
+
+Trades live in an append-only JSONL log (one trade per line), so logging
+a trade writes O(1) bytes regardless of history size. Deletions append a
+tombstone line; the log is compacted when tombstones pile up.
 """
 
 import json
 import os
-from datetime import datetime
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+# Same optional fast codec storage.py uses; one journal line per call,
+# so the per-line decode cost is the whole parse cost
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson:
+    _dumps = orjson.dumps
+
+    def _loads(line):
+        return orjson.loads(line)
+else:
+    def _dumps(entry):
+        return json.dumps(entry).encode()
+
+    def _loads(line):
+        return json.loads(line)
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
-JOURNAL_FILE = os.path.join(DATA_DIR, 'journal.json')
+JOURNAL_FILE = os.path.join(DATA_DIR, 'journal.jsonl')
+LEGACY_JOURNAL_FILE = os.path.join(DATA_DIR, 'journal.json')
+
+# Compact once tombstones exceed this share of log lines
+COMPACT_TOMBSTONE_RATIO = 0.2
+
+
+@dataclass(slots=True)
+class Trade:
+    """A completed trade; slots keep per-instance memory flat."""
+    id: int
+    pair: str
+    direction: str
+    entry_price: float
+    exit_price: float
+    lot_size: float
+    pips: float
+    notes: str = ""
+    date: str = ""
+
+
+def _migrate_legacy_journal():
+    """One-shot migration from the old journal.json array format."""
+    if os.path.exists(JOURNAL_FILE) or not os.path.exists(LEGACY_JOURNAL_FILE):
+        return
+    try:
+        with open(LEGACY_JOURNAL_FILE, 'rb') as f:
+            trades = _loads(f.read()).get('trades', [])
+    except ValueError:
+        trades = []
+    with open(JOURNAL_FILE, 'wb') as f:
+        for trade in trades:
+            f.write(_dumps(trade) + b'\n')
+    os.remove(LEGACY_JOURNAL_FILE)
 
 
 def load_journal():
-    """Load trade journal from JSON file."""
-    os.makedirs(DATA_DIR, exist_ok=True)
+    """
+    Load the trade journal by streaming the JSONL log.
 
-    if not os.path.exists(JOURNAL_FILE):
-        default = {"trades": []}
-        save_journal(default)
-        return default
+    Tombstoned (deleted) trades are filtered out; when they exceed
+    COMPACT_TOMBSTONE_RATIO of the log, the file is rewritten compactly.
 
-    try:
-        with open(JOURNAL_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {"trades": []}
+    Returns:
+        dict: {"trades": [...]}
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    _migrate_legacy_journal()
+
+    trades = {}
+    tombstones = 0
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    continue
+                if entry.get('_del'):
+                    trades.pop(entry.get('id'), None)
+                    tombstones += 1
+                else:
+                    trades[entry['id']] = entry
+
+    journal = {"trades": list(trades.values())}
+    if tombstones > COMPACT_TOMBSTONE_RATIO * (len(trades) + tombstones):
+        save_journal(journal)
+    return journal
 
 
 def save_journal(journal):
-    """Save trade journal to JSON file."""
+    """
+    Rewrite the whole journal log (compaction); appends are preferred.
+
+    The lines are serialized into one buffer and written to a sibling
+    .tmp file that replaces the log atomically, so a crash mid-compaction
+    cannot leave a truncated journal.
+    """
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(JOURNAL_FILE, 'w') as f:
-        json.dump(journal, f, indent=2)
+    buf = b''.join(_dumps(trade) + b'\n' for trade in journal['trades'])
+    tmp = JOURNAL_FILE + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, JOURNAL_FILE)
+
+
+def _append_entry(entry):
+    """Append one line to the journal log - O(1) in journal size."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    _migrate_legacy_journal()
+    with open(JOURNAL_FILE, 'ab') as f:
+        f.write(_dumps(entry) + b'\n')
 
 
 def add_trade(pair, direction, entry_price, exit_price, lot_size, notes=""):
@@ -47,51 +147,46 @@ def add_trade(pair, direction, entry_price, exit_price, lot_size, notes=""):
         notes: Optional trade notes
 
     Returns:
-        dict: The created trade entry
+        Trade: The created trade
     """
-    journal = load_journal()
-
-    # Calculate P/L in pips
-    if direction == "BUY":
-        pips = (exit_price - entry_price) * 10000
-    else:
-        pips = (entry_price - exit_price) * 10000
-
-    # Handle JPY pairs (2 decimal places instead of 4)
-    if "JPY" in pair:
-        if direction == "BUY":
-            pips = (exit_price - entry_price) * 100
-        else:
-            pips = (entry_price - exit_price) * 100
-
-    trade = {
-        "id": int(datetime.now().timestamp() * 1000),
-        "pair": pair,
-        "direction": direction,
-        "entry_price": entry_price,
-        "exit_price": exit_price,
-        "lot_size": lot_size,
-        "pips": round(pips, 1),
-        "notes": notes,
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M")
-    }
-
-    journal["trades"].append(trade)
-    save_journal(journal)
+    # P/L in pips: sign flips for shorts, JPY pairs use 2 decimals not 4
+    sign = 1 if direction == "BUY" else -1
+    mult = 100 if "JPY" in pair else 10000
+    pips = sign * (exit_price - entry_price) * mult
+
+    # time_ns skips the datetime object build and cannot collide at
+    # millisecond granularity
+    trade = Trade(
+        id=time.time_ns(),
+        pair=pair,
+        direction=direction,
+        entry_price=entry_price,
+        exit_price=exit_price,
+        lot_size=lot_size,
+        pips=round(pips, 1),
+        notes=notes,
+        date=time.strftime("%Y-%m-%d %H:%M")
+    )
+
+    _append_entry(asdict(trade))
     return trade
 
 
 def delete_trade(trade_id):
-    """Delete a trade from the journal by ID."""
-    journal = load_journal()
-    journal["trades"] = [t for t in journal["trades"] if t["id"] != trade_id]
-    save_journal(journal)
+    """Delete a trade by appending a tombstone line for its ID."""
+    _append_entry({"id": trade_id, "_del": True})
 
 
 def get_all_trades():
-    """Get all trades sorted by date (newest first)."""
+    """
+    Get all trades as Trade objects, newest first.
+
+    IDs are timestamps assigned at append time and the log is
+    append-only, so trades are already stored oldest-first; reversing
+    replaces the O(n log n) sort with an O(n) pass.
+    """
     journal = load_journal()
-    return sorted(journal["trades"], key=lambda t: t["id"], reverse=True)
+    return [Trade(**t) for t in reversed(journal["trades"])]
 
 
 def get_journal_stats():
@@ -116,25 +211,21 @@ def get_journal_stats():
             "most_traded_pair": "-"
         }
 
-    wins = [t for t in trades if t["pips"] > 0]
-    losses = [t for t in trades if t["pips"] <= 0]
-    total_pips = sum(t["pips"] for t in trades)
-    pips_list = [t["pips"] for t in trades]
+    # One vectorized pass over the pips column instead of five Python loops
+    pips = np.array([t.pips for t in trades], dtype=np.float64)
+    wins = int(np.count_nonzero(pips > 0))
+    total_pips = float(pips.sum())
 
-    # Most traded pair
-    pair_counts = {}
-    for t in trades:
-        pair_counts[t["pair"]] = pair_counts.get(t["pair"], 0) + 1
-    most_traded = max(pair_counts, key=pair_counts.get)
+    most_traded = Counter(t.pair for t in trades).most_common(1)[0][0]
 
     return {
         "total_trades": len(trades),
-        "wins": len(wins),
-        "losses": len(losses),
-        "win_rate": round(len(wins) / len(trades) * 100, 1),
+        "wins": wins,
+        "losses": len(trades) - wins,
+        "win_rate": round(wins / len(trades) * 100, 1),
         "total_pips": round(total_pips, 1),
         "avg_pips": round(total_pips / len(trades), 1),
-        "best_trade": round(max(pips_list), 1),
-        "worst_trade": round(min(pips_list), 1),
+        "best_trade": round(float(pips.max()), 1),
+        "worst_trade": round(float(pips.min()), 1),
         "most_traded_pair": most_traded
     }
@@ -15,7 +15,8 @@ Usage:
 """
 
 import click
-from watchlist import add_pair, remove_pair, add_alert, remove_alert, list_pairs
+from concurrent.futures import ThreadPoolExecutor
+from watchlist import add_pair, remove_pair, add_pair_and_alert, remove_alert, list_pairs
 from rates import get_rate, get_available_currencies
 from alerts import check_alerts
 
@@ -31,7 +32,12 @@ def cli():
 @click.argument('quote')
 def add(base, quote):
     """Add a currency pair to your watchlist."""
-    if add_pair(base, quote):
+    try:
+        added = add_pair(base, quote)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+    if added:
         click.echo(f"Added {base.upper()}/{quote.upper()} to watchlist")
     else:
         click.echo(f"{base.upper()}/{quote.upper()} already in watchlist")
@@ -56,24 +62,17 @@ def remove(base, quote):
 @click.argument('note', default='')
 def alert(base, quote, alert_type, target, note):
     """Set a price alert for a currency pair."""
-    # First check if pair exists
-    pairs = list_pairs()
-    pair_exists = any(
-        p['base'] == base.upper() and p['quote'] == quote.upper()
-        for p in pairs
-    )
-
-    if not pair_exists:
-        # Auto-add the pair
-        add_pair(base, quote)
-        click.echo(f"Added {base.upper()}/{quote.upper()} to watchlist")
+    # One load/save: the pair is auto-added alongside the alert if missing
+    try:
+        if add_pair_and_alert(base, quote, alert_type, target, note):
+            click.echo(f"Added {base.upper()}/{quote.upper()} to watchlist")
+    except ValueError as e:
+        click.echo(str(e))
+        return
 
-    if add_alert(base, quote, alert_type, target, note):
-        click.echo(f"Alert set: {base.upper()}/{quote.upper()} {alert_type} {target}")
-        if note:
-            click.echo(f"Note: {note}")
-    else:
-        click.echo("Failed to set alert")
+    click.echo(f"Alert set: {base.upper()}/{quote.upper()} {alert_type} {target}")
+    if note:
+        click.echo(f"Note: {note}")
 
 
 @cli.command('list')
@@ -85,22 +84,25 @@ def list_cmd():
         click.echo("Watchlist is empty. Add pairs with: forex add EUR USD")
         return
 
-    click.echo("\n=== Forex Watchlist ===\n")
+    # Buffer everything and flush with one echo/write syscall
+    lines = ["", "=== Forex Watchlist ===", ""]
 
     for pair in pairs:
         rate_info = ""
         if pair.get('last_rate'):
             rate_info = f" (last: {pair['last_rate']:.4f})"
 
-        click.echo(f"{pair['base']}/{pair['quote']}{rate_info}")
+        lines.append(f"{pair['base']}/{pair['quote']}{rate_info}")
 
         if pair['alerts']:
             for i, alert in enumerate(pair['alerts']):
                 note = f" - {alert['note']}" if alert.get('note') else ""
-                click.echo(f"  [{i}] {alert['type']} {alert['target']:.4f}{note}")
+                lines.append(f"  [{i}] {alert['type']} {alert['target']:.4f}{note}")
         else:
-            click.echo("  No alerts set")
-        click.echo()
+            lines.append("  No alerts set")
+        lines.append("")
+
+    click.echo("\n".join(lines))
 
 
 @cli.command()
@@ -133,14 +135,17 @@ def rates():
         click.echo("Watchlist is empty. Add pairs with: forex add EUR USD")
         return
 
-    click.echo("\n=== Current Rates ===\n")
+    # Fetch concurrently, then print all results with a single echo
+    with ThreadPoolExecutor(max_workers=min(6, len(pairs))) as executor:
+        fetched = executor.map(lambda p: get_rate(p['base'], p['quote']), pairs)
 
-    for pair in pairs:
-        rate = get_rate(pair['base'], pair['quote'])
+    lines = ["", "=== Current Rates ===", ""]
+    for pair, rate in zip(pairs, fetched):
         if rate:
-            click.echo(f"{pair['base']}/{pair['quote']}: {rate:.4f}")
+            lines.append(f"{pair['base']}/{pair['quote']}: {rate:.4f}")
         else:
-            click.echo(f"{pair['base']}/{pair['quote']}: Error fetching rate")
+            lines.append(f"{pair['base']}/{pair['quote']}: Error fetching rate")
+    click.echo("\n".join(lines))
 
 
 @cli.command()
@@ -7,93 +7,296 @@ Usage: python monitor.py [--interval 60]
 """
 
 import argparse
+import atexit
+import json
 import time
 import platform
 import subprocess
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from watchlist import list_pairs
+from watchlist import alert_soa, count_alerts, list_pairs
 from rates import get_rate
-from alerts import check_alert_triggered
-from storage import load_watchlist, save_watchlist
 
+# The fetch phase gathers every pair concurrently; aiohttp is preferred
+# (one event loop, pooled connections), threads cover the sync get_rate
+# path when it is not installed
+try:
+    import asyncio
+    from rates_async import fetch_all_rates
+except ImportError:
+    fetch_all_rates = None
+
+MAX_FETCH_WORKERS = 6
+
+
+def fetch_rates(pairs):
+    """
+    Fetch rates for all pairs concurrently.
+
+    Returns:
+        dict: {(base, quote): rate} with None for failed fetches
+    """
+    if fetch_all_rates is not None:
+        return asyncio.run(fetch_all_rates(pairs))
+
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(pairs))) as executor:
+        rates = executor.map(lambda p: get_rate(p['base'], p['quote']), pairs)
+        return {(p['base'], p['quote']): r for p, r in zip(pairs, rates)}
+
+
+def _escape_osa(text):
+    """Escape text for an AppleScript double-quoted string literal."""
+    return json.dumps(str(text))[1:-1]
+
+
+def _escape_ps(text):
+    """
+    Escape text for a PowerShell double-quoted string literal.
+
+    Newlines become \`n as well: the script is streamed line-by-line to
+    the warm host's stdin, so a literal newline inside a string would
+    split the command mid-statement.
+    """
+    return (str(text)
+            .replace('`', '``')
+            .replace('"', '`"')
+            .replace('$', '`$')
+            .replace('\r', '')
+            .replace('\n', '`n'))
+
+
+_PS_TOAST_TEMPLATE = '''
+[Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
+$template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02)
+$textNodes = $template.GetElementsByTagName("text")
+$textNodes.Item(0).AppendChild($template.CreateTextNode("{title}")) | Out-Null
+$textNodes.Item(1).AppendChild($template.CreateTextNode("{message}")) | Out-Null
+$toast = [Windows.UI.Notifications.ToastNotification]::new($template)
+[Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("Forex Watchlist").Show($toast)
+'''
+
+
+# Long-lived PowerShell process for Windows toasts: startup (and WinRT
+# assembly loading) is PowerShell's dominant cost, so pay it once per
+# monitor run and stream scripts to its stdin afterwards
+_ps_host = None
+
+
+def _powershell_host():
+    """Return the persistent PowerShell process, starting it if needed."""
+    global _ps_host
+    if _ps_host is None or _ps_host.poll() is not None:
+        _ps_host = subprocess.Popen(
+            ["powershell", "-NoProfile", "-NoLogo", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    return _ps_host
+
+
+def _close_powershell_host():
+    """Shut the persistent PowerShell process down cleanly."""
+    global _ps_host
+    if _ps_host is not None:
+        try:
+            _ps_host.stdin.close()
+            _ps_host.wait(timeout=5)
+        except Exception:
+            pass
+        _ps_host = None
+
+
+atexit.register(_close_powershell_host)
+
+
+def send_desktop_notifications(notifications):
+    """
+    Send a batch of desktop notifications with one subprocess call.
+
+    Subprocess startup (fork+exec, PowerShell cold start) dominates
+    notification latency, so a tick with several triggered alerts pays
+    it once instead of once per alert.
+
+    Args:
+        notifications (list): (title, message) tuples
+
+    Returns:
+        bool: True if the batch was dispatched
+    """
+    if not notifications:
+        return True
 
-def send_desktop_notification(title, message):
-    """Send a desktop notification based on OS."""
     system = platform.system()
 
     try:
         if system == "Darwin":  # macOS
-            # Use osascript for macOS notifications
-            script = f'display notification "{message}" with title "{title}" sound name "Glass"'
-            subprocess.run(["osascript", "-e", script], check=True)
+            # One osascript process running one -e clause per alert
+            command = ["osascript"]
+            for title, message in notifications:
+                # The note rides in the message, so both fields are
+                # escaped before entering the AppleScript literal
+                command += ["-e", f'display notification "{_escape_osa(message)}" with title "{_escape_osa(title)}" sound name "Glass"']
+            subprocess.run(command, check=True)
         elif system == "Linux":
+            # notify-send shows one notification per process; fold the
+            # batch into a single summary notification
+            if len(notifications) == 1:
+                title, message = notifications[0]
+            else:
+                title = f"Forex Alerts ({len(notifications)})"
+                message = "\n".join(f"{t}: {m}" for t, m in notifications)
             subprocess.run(["notify-send", "-u", "critical", title, message], check=True)
         elif system == "Windows":
-            # Use PowerShell for Windows notifications
-            ps_script = f'''
-            [Windows.UI.Notifications.ToastNotificationManager, Windows.UI.Notifications, ContentType = WindowsRuntime] | Out-Null
-            $template = [Windows.UI.Notifications.ToastNotificationManager]::GetTemplateContent([Windows.UI.Notifications.ToastTemplateType]::ToastText02)
-            $textNodes = $template.GetElementsByTagName("text")
-            $textNodes.Item(0).AppendChild($template.CreateTextNode("{title}")) | Out-Null
-            $textNodes.Item(1).AppendChild($template.CreateTextNode("{message}")) | Out-Null
-            $toast = [Windows.UI.Notifications.ToastNotification]::new($template)
-            [Windows.UI.Notifications.ToastNotificationManager]::CreateToastNotifier("Forex Watchlist").Show($toast)
-            '''
-            subprocess.run(["powershell", "-Command", ps_script], check=True)
-
-        print(f"[NOTIFICATION] {title}: {message}")
+            # Stream every toast to the warm PowerShell host; fall back
+            # to a one-shot process if the pipe is broken
+            ps_script = "\n".join(
+                _PS_TOAST_TEMPLATE.format(title=_escape_ps(title),
+                                          message=_escape_ps(message))
+                for title, message in notifications
+            )
+            try:
+                host = _powershell_host()
+                host.stdin.write(ps_script + "\n")
+                host.stdin.flush()
+            except (OSError, ValueError):
+                _close_powershell_host()
+                subprocess.run(["powershell", "-Command", ps_script], check=True)
+
+        for title, message in notifications:
+            print(f"[NOTIFICATION] {title}: {message}")
         return True
     except Exception as e:
         print(f"[ERROR] Could not send notification: {e}")
-        print(f"[ALERT] {title}: {message}")
+        for title, message in notifications:
+            print(f"[ALERT] {title}: {message}")
         return False
 
 
-def check_and_notify(triggered_cache):
-    """Check all alerts and send notifications for newly triggered ones."""
-    pairs = list_pairs()
-    newly_triggered = []
+def send_desktop_notification(title, message):
+    """Send a single desktop notification based on OS."""
+    return send_desktop_notifications([(title, message)])
 
-    for pair in pairs:
-        if not pair['alerts']:
-            continue
-
-        pair_key = f"{pair['base']}/{pair['quote']}"
-        rate = get_rate(pair['base'], pair['quote'])
-
-        if rate is None:
-            continue
-
-        for i, alert in enumerate(pair['alerts']):
-            alert_key = f"{pair_key}_{alert['type']}_{alert['target']}"
-
-            if check_alert_triggered(alert, rate):
-                # Only notify if not already triggered recently
-                if alert_key not in triggered_cache:
-                    triggered_cache[alert_key] = datetime.now()
-
-                    direction = "above" if alert['type'] == 'above' else "below"
-                    title = f"Forex Alert: {pair_key}"
-                    message = f"Price is now {direction} {alert['target']:.5f}\nCurrent: {rate:.5f}"
-                    if alert.get('note'):
-                        message += f"\n{alert['note']}"
-
-                    send_desktop_notification(title, message)
-                    newly_triggered.append({
-                        'pair': pair_key,
-                        'type': alert['type'],
-                        'target': alert['target'],
-                        'rate': rate
-                    })
-            else:
-                # Remove from cache if alert is no longer triggered (price moved back)
-                if alert_key in triggered_cache:
-                    del triggered_cache[alert_key]
+
+def check_and_notify(triggered_set, rates_map=None):
+    """
+    Check all alerts and send notifications for newly triggered ones.
+
+    Args:
+        triggered_set (set): (base, quote, type, target) tuples already
+            notified, to prevent spam
+        rates_map (dict): Optional prefetched {(base, quote): rate}; when
+            omitted, rates are fetched here
+    """
+    pairs = [p for p in list_pairs() if p['alerts']]
+    newly_triggered = []
+    notifications = []
+
+    # One concurrent fetch pass over unique (base, quote) combinations,
+    # then a pure-Python check loop: cycle wall time becomes max(RTT)
+    # across distinct pairs instead of the sum over all entries
+    if rates_map is None:
+        needed = {(p['base'], p['quote']) for p in pairs}
+        rates_map = fetch_rates(
+            [{'base': b, 'quote': q} for b, q in needed]
+        ) if needed else {}
+
+    # Every alert target is evaluated in two vectorized compares over
+    # the cached struct-of-arrays index instead of a Python loop per
+    # alert dict
+    triggered_now = set()
+    for pair, alert, rate in alert_soa().triggered(rates_map):
+        pair_key = pair.get('_name') or f"{pair['base']}/{pair['quote']}"
+        # Tuple keys skip the per-alert f-string build and hash
+        alert_key = (pair['base'], pair['quote'], alert['type'], alert['target'])
+        triggered_now.add(alert_key)
+
+        # Only notify if not already triggered recently
+        if alert_key not in triggered_set:
+            triggered_set.add(alert_key)
+
+            # Static parts come preformatted from list_pairs; only the
+            # current rate is fresh per tick
+            title = alert.get('_title') or f"Forex Alert: {pair_key}"
+            prefix = alert.get('_prefix') or \
+                f"Price is now {alert['type']} {alert['target']:.5f}"
+            message = f"{prefix}\nCurrent: {rate:.5f}"
+            if alert.get('note'):
+                message += f"\n{alert['note']}"
+
+            notifications.append((title, message))
+            newly_triggered.append({
+                'pair': pair_key,
+                'type': alert['type'],
+                'target': alert['target'],
+                'rate': rate
+            })
+
+    # Re-arm alerts whose price moved back, but only when the pair's
+    # rate was actually fetched this tick
+    for key in triggered_set - triggered_now:
+        if rates_map.get((key[0], key[1])) is not None:
+            triggered_set.discard(key)
+
+    # All of this tick's alerts ride one subprocess invocation
+    send_desktop_notifications(notifications)
 
     return newly_triggered
 
 
+def _print_cycle_result(triggered):
+    """Print one cycle's outcome in the monitor's log format."""
+    if triggered:
+        print(f"{len(triggered)} TRIGGERED!")
+        for t in triggered:
+            print(f"  -> {t['pair']}: {t['type']} {t['target']:.5f} (now: {t['rate']:.5f})")
+    else:
+        print("OK")
+
+
+async def main_async(interval, triggered_set):
+    """
+    Async monitor loop.
+
+    One aiohttp session lives across cycles so TCP/TLS connections are
+    reused, and the sleep is awaited so SIGINT shuts down promptly.
+    """
+    import signal
+    from rates_async import make_session
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, stop.set)
+    except NotImplementedError:
+        # add_signal_handler is unsupported on Windows event loops;
+        # KeyboardInterrupt still unwinds asyncio.run
+        pass
+
+    async with make_session() as session:
+        while not stop.is_set():
+            timestamp = time.strftime("%H:%M:%S")
+
+            # Reload pairs in case they were updated
+            pairs = [p for p in list_pairs() if p['alerts']]
+            alert_count = count_alerts()
+
+            print(f"[{timestamp}] Checking {alert_count} alerts...", end=" ")
+
+            needed = {(p['base'], p['quote']) for p in pairs}
+            rates_map = await fetch_all_rates(
+                [{'base': b, 'quote': q} for b, q in needed], session
+            ) if needed else {}
+            triggered = check_and_notify(triggered_set, rates_map)
+            _print_cycle_result(triggered)
+
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+
 def main():
     parser = argparse.ArgumentParser(description="Monitor forex alerts and send notifications")
     parser.add_argument("--interval", "-i", type=int, default=60,
@@ -107,12 +310,22 @@ def main():
     print("Press Ctrl+C to stop")
     print("=" * 50)
 
-    # Cache to track already-triggered alerts (prevent spam)
-    triggered_cache = {}
+    # Tracks already-triggered alerts to prevent notification spam
+    triggered_set = set()
 
     # Initial check
     pairs = list_pairs()
-    alert_count = sum(len(p['alerts']) for p in pairs)
+
+    # Prefer push updates over polling when the optional websocket
+    # dependency is installed; both fetch paths read the stream first -
+    # fetch_all_rates as its top tier, get_rate transparently
+    try:
+        import ws_client
+        if ws_client.is_available() and ws_client.start_stream(pairs):
+            print("TradingView quote stream active (push mode)")
+    except Exception:
+        pass
+    alert_count = count_alerts()
     print(f"\nMonitoring {len(pairs)} pair(s) with {alert_count} alert(s)")
 
     if alert_count == 0:
@@ -123,24 +336,26 @@ def main():
 
     print("\nStarting monitor...\n")
 
+    if fetch_all_rates is not None:
+        try:
+            asyncio.run(main_async(args.interval, triggered_set))
+        except KeyboardInterrupt:
+            pass
+        print("\n\nMonitor stopped.")
+        return
+
+    # Sync fallback when aiohttp is not installed
     try:
         while True:
-            timestamp = datetime.now().strftime("%H:%M:%S")
+            timestamp = time.strftime("%H:%M:%S")
 
             # Reload pairs in case they were updated
-            pairs = list_pairs()
-            alert_count = sum(len(p['alerts']) for p in pairs)
+            alert_count = count_alerts()
 
             print(f"[{timestamp}] Checking {alert_count} alerts...", end=" ")
 
-            triggered = check_and_notify(triggered_cache)
-
-            if triggered:
-                print(f"{len(triggered)} TRIGGERED!")
-                for t in triggered:
-                    print(f"  -> {t['pair']}: {t['type']} {t['target']:.5f} (now: {t['rate']:.5f})")
-            else:
-                print("OK")
+            triggered = check_and_notify(triggered_set)
+            _print_cycle_result(triggered)
 
             time.sleep(args.interval)
 
@@ -5,7 +5,17 @@ Tracks open positions and calculates overall profit/loss.
 
 import json
 import os
-from datetime import datetime
+import time
+
+import numpy as np
+
+# Same optional orjson fast path as storage.py
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from storage import write_if_changed
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 PORTFOLIO_FILE = os.path.join(DATA_DIR, 'portfolio.json')
@@ -21,17 +31,35 @@ def load_portfolio():
         return default
 
     try:
-        with open(PORTFOLIO_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        with open(PORTFOLIO_FILE, 'rb') as f:
+            raw = f.read()
+        portfolio = orjson.loads(raw) if orjson else json.loads(raw)
+    except ValueError:
         return {"positions": []}
 
+    # Backfill pip_mult on positions saved before it was stored
+    positions = portfolio.get("positions", [])
+    for position in positions:
+        if "pip_mult" not in position:
+            position["pip_mult"] = 100.0 if "JPY" in position["pair"] else 10000.0
+
+    # IDs are timestamps assigned at open time, so the list is normally
+    # already ascending; sort once here only for legacy files that were
+    # edited out of order
+    if any(positions[i]["id"] > positions[i + 1]["id"]
+           for i in range(len(positions) - 1)):
+        positions.sort(key=lambda p: p["id"])
+    return portfolio
+
 
 def save_portfolio(portfolio):
     """Save portfolio to JSON file."""
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(PORTFOLIO_FILE, 'w') as f:
-        json.dump(portfolio, f, indent=2)
+    if orjson:
+        serialized = orjson.dumps(portfolio, option=orjson.OPT_INDENT_2)
+    else:
+        serialized = json.dumps(portfolio, indent=2).encode()
+    write_if_changed(PORTFOLIO_FILE, serialized)
 
 
 def open_position(pair, direction, entry_price, lot_size, stop_loss=None, take_profit=None, notes=""):
@@ -53,7 +81,7 @@ def open_position(pair, direction, entry_price, lot_size, stop_loss=None, take_p
     portfolio = load_portfolio()
 
     position = {
-        "id": int(datetime.now().timestamp() * 1000),
+        "id": time.time_ns(),
         "pair": pair,
         "direction": direction,
         "entry_price": entry_price,
@@ -61,7 +89,9 @@ def open_position(pair, direction, entry_price, lot_size, stop_loss=None, take_p
         "stop_loss": stop_loss,
         "take_profit": take_profit,
         "notes": notes,
-        "opened_at": datetime.now().strftime("%Y-%m-%d %H:%M")
+        "opened_at": time.strftime("%Y-%m-%d %H:%M"),
+        # Resolved once here so P/L math never re-scans the pair string
+        "pip_mult": 100.0 if "JPY" in pair else 10000.0
     }
 
     portfolio["positions"].append(position)
@@ -77,9 +107,14 @@ def close_position(position_id):
 
 
 def get_all_positions():
-    """Get all open positions sorted by date (newest first)."""
+    """
+    Get all open positions, newest first.
+
+    Positions are kept in ascending id (open-time) order on disk, so
+    newest-first is a reverse, not a sort.
+    """
     portfolio = load_portfolio()
-    return sorted(portfolio["positions"], key=lambda p: p["id"], reverse=True)
+    return list(reversed(portfolio["positions"]))
 
 
 def calculate_pips(pair, direction, entry_price, current_price):
@@ -95,18 +130,41 @@ def calculate_pips(pair, direction, entry_price, current_price):
     Returns:
         float: P/L in pips
     """
-    if direction == "BUY":
-        pips = (current_price - entry_price)
-    else:
-        pips = (entry_price - current_price)
-
+    sign = 1 if direction == "BUY" else -1
     # JPY pairs use 2 decimal pip calculation
-    if "JPY" in pair:
-        pips *= 100
-    else:
-        pips *= 10000
+    mult = 100 if "JPY" in pair else 10000
+    return round(sign * (current_price - entry_price) * mult, 1)
+
+
+def calculate_pips_bulk(positions, prices):
+    """
+    Vectorized unrealized P/L for many positions at once.
 
-    return round(pips, 1)
+    Args:
+        positions: List of position dictionaries
+        prices: Parallel list of current prices (None for unavailable)
+
+    Returns:
+        list: P/L in pips per position (0.0 where the price is missing)
+    """
+    if not positions:
+        return []
+
+    entries = np.array([p["entry_price"] for p in positions], dtype=np.float64)
+    current = np.array(
+        [price if price is not None else np.nan for price in prices],
+        dtype=np.float64
+    )
+    signs = np.array(
+        [1.0 if p["direction"] == "BUY" else -1.0 for p in positions]
+    )
+    mults = np.array(
+        [p.get("pip_mult") or (100.0 if "JPY" in p["pair"] else 10000.0)
+         for p in positions]
+    )
+
+    pips = np.round(signs * (current - entries) * mults, 1)
+    return [0.0 if np.isnan(value) else float(value) for value in pips]
 
 
 def get_portfolio_summary(positions_with_pips):
@@ -128,10 +186,12 @@ def get_portfolio_summary(positions_with_pips):
             "total_lots": 0
         }
 
-    total_pips = sum(pips for _, pips in positions_with_pips)
-    winning = sum(1 for _, pips in positions_with_pips if pips > 0)
-    losing = sum(1 for _, pips in positions_with_pips if pips <= 0)
-    total_lots = sum(p["lot_size"] for p, _ in positions_with_pips)
+    # One vectorized pass instead of four generator sweeps
+    pips = np.array([pips for _, pips in positions_with_pips], dtype=np.float64)
+    total_pips = float(pips.sum())
+    winning = int(np.count_nonzero(pips > 0))
+    losing = len(positions_with_pips) - winning
+    total_lots = float(sum(p["lot_size"] for p, _ in positions_with_pips))
 
     return {
         "total_positions": len(positions_with_pips),
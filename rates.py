@@ -5,17 +5,152 @@ Falls back to Frankfurter API if TradingView is rate limited.
 No API key required.
 """
 
+import os
+import random
+import sqlite3
+import threading
 import time
+from functools import lru_cache
+
 import requests
+from requests.adapters import HTTPAdapter
 from tradingview_ta import TA_Handler, Interval
+from urllib3.util.retry import Retry
+
+# Decode Frankfurter payloads with orjson when available; the responses
+# are tiny but this path runs once per cache miss
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared session so repeated fetches reuse pooled TCP/TLS connections
+# instead of paying a handshake per request; transient failures retry
+# with a short backoff instead of surfacing as a missed rate
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    ),
+))
 
 # Cache for rate limiting (stores last fetch time and result)
 _rate_cache = {}
 CACHE_DURATION = 30  # seconds
 
-# Track if TradingView is rate limited
-_tradingview_blocked_until = 0
-BLOCK_DURATION = 300  # 5 minutes cooldown when rate limited
+# On-disk tier behind the in-memory cache: scalar rates persist across
+# process restarts, so a monitor restart warms from disk instead of
+# hammering the providers into a 429 cooldown
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+RATE_DB_FILE = os.path.join(DATA_DIR, 'rates.db')
+
+_db_lock = threading.Lock()
+_cache_db = None
+
+
+def _rate_db():
+    """Open (once) the sqlite cache; WAL allows monitor+app access."""
+    global _cache_db
+    if _cache_db is None:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _cache_db = sqlite3.connect(
+            RATE_DB_FILE, isolation_level=None, check_same_thread=False
+        )
+        _cache_db.execute("PRAGMA journal_mode=WAL")
+        _cache_db.execute(
+            "CREATE TABLE IF NOT EXISTS rates (key TEXT PRIMARY KEY, rate REAL, ts REAL)"
+        )
+    return _cache_db
+
+
+def _db_get(key):
+    """Fetch (rate, ts) from the on-disk cache, or None."""
+    try:
+        with _db_lock:
+            return _rate_db().execute(
+                "SELECT rate, ts FROM rates WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+
+
+def _db_put(key, rate, ts):
+    """Store a fetched rate in the on-disk cache (best effort)."""
+    try:
+        with _db_lock:
+            _rate_db().execute(
+                "INSERT OR REPLACE INTO rates (key, rate, ts) VALUES (?, ?, ?)",
+                (key, rate, ts)
+            )
+    except sqlite3.Error:
+        pass
+
+
+def _cache_get(key, now):
+    """Fresh rate from memory or disk, or None if expired everywhere."""
+    if key in _rate_cache:
+        cached_time, cached_rate = _rate_cache[key]
+        if now - cached_time < CACHE_DURATION:
+            return cached_rate
+    row = _db_get(key)
+    if row is not None and now - row[1] < CACHE_DURATION:
+        _rate_cache[key] = (row[1], row[0])
+        return row[0]
+    return None
+
+
+def _cache_put(key, rate, now):
+    """Store a rate in both cache tiers."""
+    _rate_cache[key] = (now, rate)
+    _db_put(key, rate, now)
+
+
+def _cache_get_stale(key):
+    """Last known rate regardless of age (memory first, then disk)."""
+    if key in _rate_cache:
+        return _rate_cache[key][1]
+    row = _db_get(key)
+    return row[0] if row is not None else None
+
+
+class Breaker:
+    """
+    Tiny per-upstream circuit breaker.
+
+    Consecutive failures open the breaker for an exponentially growing,
+    jittered window (capped at 10 minutes) so a struggling provider is
+    probed gently instead of hammered on a fixed cooldown; one success
+    closes it again.
+    """
+    __slots__ = ('fail_count', 'open_until')
+
+    def __init__(self):
+        self.fail_count = 0
+        self.open_until = 0.0
+
+    def allow(self):
+        """True if a request may be attempted now."""
+        return time.time() >= self.open_until
+
+    def record_fail(self):
+        """Note a failure and extend the open window."""
+        self.fail_count += 1
+        backoff = min(600, 2 ** self.fail_count)
+        self.open_until = time.time() + backoff + random.uniform(0, backoff * 0.1)
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        self.fail_count = 0
+        self.open_until = 0.0
+
+
+_tv_breaker = Breaker()
+_frankfurter_breaker = Breaker()
 
 # Common forex pairs available on OANDA via TradingView
 FOREX_PAIRS = {
@@ -53,37 +188,58 @@ FOREX_PAIRS = {
 }
 
 
+# Flat (base, quote) -> symbol map with reversed pairs precomputed, so
+# symbol resolution is one dict probe instead of two f-string builds
+_SYMBOL_LOOKUP = {}
+for _key, (_symbol, _) in FOREX_PAIRS.items():
+    _base, _quote = _key.split('/')
+    _SYMBOL_LOOKUP[(_base, _quote)] = _symbol
+    _SYMBOL_LOOKUP.setdefault((_quote, _base), _symbol)
+
+
 def get_symbol(base, quote):
     """Convert base/quote to TradingView symbol."""
-    pair_key = f"{base.upper()}/{quote.upper()}"
-    if pair_key in FOREX_PAIRS:
-        return FOREX_PAIRS[pair_key][0]
-    # Try reverse
-    reverse_key = f"{quote.upper()}/{base.upper()}"
-    if reverse_key in FOREX_PAIRS:
-        return FOREX_PAIRS[reverse_key][0]
-    return None
+    return _SYMBOL_LOOKUP.get((base.upper(), quote.upper()))
 
 
 def _get_rate_frankfurter(base, quote):
     """Fallback: fetch rate from Frankfurter API (ECB data)."""
+    if not _frankfurter_breaker.allow():
+        return None
     try:
         url = f"https://api.frankfurter.app/latest?from={base.upper()}&to={quote.upper()}"
-        response = requests.get(url, timeout=10)
+        response = _session.get(url, timeout=10)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content) if orjson else response.json()
+        _frankfurter_breaker.record_success()
         return data['rates'].get(quote.upper())
     except Exception as e:
+        _frankfurter_breaker.record_fail()
         print(f"Frankfurter fallback error: {e}")
         return None
 
 
+def _get_rates_frankfurter_bulk(base, quotes):
+    """Fallback: fetch several rates for one base in a single Frankfurter call."""
+    if not _frankfurter_breaker.allow():
+        return {}
+    try:
+        url = f"https://api.frankfurter.app/latest?from={base.upper()}&to={','.join(q.upper() for q in quotes)}"
+        response = _session.get(url, timeout=10)
+        response.raise_for_status()
+        data = orjson.loads(response.content) if orjson else response.json()
+        _frankfurter_breaker.record_success()
+        return data.get('rates', {})
+    except Exception as e:
+        _frankfurter_breaker.record_fail()
+        print(f"Frankfurter bulk fallback error: {e}")
+        return {}
+
+
 def _get_rate_tradingview(base, quote):
     """Fetch rate from TradingView."""
-    global _tradingview_blocked_until
-
-    # Check if we're in cooldown
-    if time.time() < _tradingview_blocked_until:
+    # Breaker open: still backing off from earlier failures
+    if not _tv_breaker.allow():
         return None
 
     symbol = get_symbol(base, quote)
@@ -98,12 +254,12 @@ def _get_rate_tradingview(base, quote):
             interval=Interval.INTERVAL_1_MINUTE
         )
         analysis = handler.get_analysis()
+        _tv_breaker.record_success()
         return analysis.indicators.get("close")
     except Exception as e:
         if "429" in str(e):
-            # Rate limited - set cooldown
-            _tradingview_blocked_until = time.time() + BLOCK_DURATION
-            print(f"TradingView rate limited. Using fallback for {BLOCK_DURATION}s")
+            _tv_breaker.record_fail()
+            print("TradingView rate limited. Backing off and using fallback")
         return None
 
 
@@ -122,11 +278,21 @@ def get_rate(base, quote):
     cache_key = f"{base}/{quote}"
     now = time.time()
 
-    # Check cache first
-    if cache_key in _rate_cache:
-        cached_time, cached_rate = _rate_cache[cache_key]
-        if now - cached_time < CACHE_DURATION:
-            return cached_rate
+    # Check cache tiers first
+    cached = _cache_get(cache_key, now)
+    if cached is not None:
+        return cached
+
+    # A running websocket stream (ws_client) serves pushed ticks from
+    # memory, skipping the network entirely
+    try:
+        from ws_client import get_live_rate
+        rate = get_live_rate(base, quote)
+        if rate is not None:
+            _cache_put(cache_key, rate, now)
+            return rate
+    except ImportError:
+        pass
 
     # Try TradingView first
     rate = _get_rate_tradingview(base, quote)
@@ -137,14 +303,67 @@ def get_rate(base, quote):
 
     # Update cache if we got a rate
     if rate is not None:
-        _rate_cache[cache_key] = (now, rate)
+        _cache_put(cache_key, rate, now)
         return rate
 
-    # Return stale cache if available
-    if cache_key in _rate_cache:
-        return _rate_cache[cache_key][1]
+    # Return stale cache if available (e.g. during a 429 cooldown)
+    return _cache_get_stale(cache_key)
 
-    return None
+
+def get_rates_bulk(base, quotes):
+    """
+    Fetch rates for several quote currencies that share one base.
+
+    Serves what it can from the cache and TradingView (which has no bulk
+    endpoint), then fills all remaining quotes with a single Frankfurter
+    request instead of one request per pair.
+
+    Args:
+        base (str): Base currency code
+        quotes (list): Quote currency codes
+
+    Returns:
+        dict: {quote: rate} for each quote a rate could be found for
+    """
+    base = base.upper()
+    now = time.time()
+    rates = {}
+    missing = []
+
+    for quote in quotes:
+        quote = quote.upper()
+        cache_key = f"{base}/{quote}"
+
+        # Fresh cache entry (memory or disk)
+        cached = _cache_get(cache_key, now)
+        if cached is not None:
+            rates[quote] = cached
+            continue
+
+        rate = _get_rate_tradingview(base, quote)
+        if rate is not None:
+            _cache_put(cache_key, rate, now)
+            rates[quote] = rate
+        else:
+            missing.append(quote)
+
+    # One batched fallback call covers every quote TradingView missed
+    if missing:
+        fetched = _get_rates_frankfurter_bulk(base, missing)
+        for quote, rate in fetched.items():
+            if rate is not None:
+                _cache_put(f"{base}/{quote}", rate, now)
+                rates[quote] = rate
+
+    # Return stale cache entries for anything still missing
+    for quote in quotes:
+        quote = quote.upper()
+        if quote not in rates:
+            stale = _cache_get_stale(f"{base}/{quote}")
+            if stale is not None:
+                rates[quote] = stale
+
+    return rates
 
 
 def get_rate_with_details(base, quote):
@@ -155,8 +374,6 @@ def get_rate_with_details(base, quote):
     Returns:
         dict: Rate details or None if failed
     """
-    global _tradingview_blocked_until
-
     cache_key = f"{base}/{quote}_details"
     now = time.time()
 
@@ -168,8 +385,8 @@ def get_rate_with_details(base, quote):
 
     symbol = get_symbol(base, quote)
 
-    # Try TradingView if not rate limited
-    if symbol and time.time() >= _tradingview_blocked_until:
+    # Try TradingView if its breaker is closed
+    if symbol and _tv_breaker.allow():
         try:
             handler = TA_Handler(
                 symbol=symbol,
@@ -178,23 +395,28 @@ def get_rate_with_details(base, quote):
                 interval=Interval.INTERVAL_1_MINUTE
             )
             analysis = handler.get_analysis()
-            indicators = analysis.indicators
+            # Bind the method and read each indicator once instead of
+            # re-probing the dict (open/change were fetched three times)
+            ind_get = analysis.indicators.get
+            open_v = ind_get("open")
+            change = ind_get("change")
 
             result = {
-                "close": indicators.get("close"),
-                "open": indicators.get("open"),
-                "high": indicators.get("high"),
-                "low": indicators.get("low"),
-                "change": indicators.get("change"),
-                "change_pct": indicators.get("change") / indicators.get("open") * 100 if indicators.get("open") else 0,
+                "close": ind_get("close"),
+                "open": open_v,
+                "high": ind_get("high"),
+                "low": ind_get("low"),
+                "change": change,
+                "change_pct": change / open_v * 100 if open_v else 0,
                 "recommendation": analysis.summary.get("RECOMMENDATION", "NEUTRAL")
             }
 
+            _tv_breaker.record_success()
             _rate_cache[cache_key] = (now, result)
             return result
         except Exception as e:
             if "429" in str(e):
-                _tradingview_blocked_until = time.time() + BLOCK_DURATION
+                _tv_breaker.record_fail()
 
     # Fallback: just get the rate from Frankfurter
     rate = _get_rate_frankfurter(base, quote)
@@ -218,10 +440,14 @@ def get_rate_with_details(base, quote):
     return None
 
 
+@lru_cache(maxsize=1)
 def get_available_currencies():
     """
     Get available forex pairs.
 
+    The pair list is static module data today; the cache keeps the
+    call-site contract cheap if this ever becomes a network fetch.
+
     Returns:
         dict: Available pairs with descriptions
     """
@@ -0,0 +1,202 @@
+"""
+Async rate fetching for Forex Watchlist.
+aiohttp counterpart to rates.get_rate for callers that run an event loop
+(e.g. a long-lived monitor). All pair fetches for one cycle are gathered
+concurrently over a shared ClientSession, so connections and TLS
+handshakes are reused instead of paid per request.
+
+fetch_all_rates keeps the same source priority as the sync path: pushed
+websocket quotes first, then TradingView (via rates.get_rates_bulk on
+the default executor - tradingview_ta is synchronous), with the direct
+Frankfurter coroutines as the last tier for anything still unresolved.
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+import ws_client
+from rates import _rate_cache, CACHE_DURATION, get_rates_bulk
+
+FRANKFURTER_URL = "https://api.frankfurter.app/latest"
+
+
+async def get_rate_async(session, base, quote):
+    """
+    Fetch one exchange rate over the given aiohttp session.
+    Serves fresh cache entries without a request and falls back to a
+    stale entry if the fetch fails.
+
+    Args:
+        session (aiohttp.ClientSession): Session to fetch with
+        base (str): Base currency code
+        quote (str): Quote currency code
+
+    Returns:
+        float: Exchange rate, or None if failed
+    """
+    base = base.upper()
+    quote = quote.upper()
+    cache_key = f"{base}/{quote}"
+    now = time.time()
+
+    if cache_key in _rate_cache:
+        cached_time, cached_rate = _rate_cache[cache_key]
+        if now - cached_time < CACHE_DURATION:
+            return cached_rate
+
+    rate = None
+    try:
+        async with session.get(
+            FRANKFURTER_URL,
+            params={"from": base, "to": quote},
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            rate = data['rates'].get(quote)
+    except Exception as e:
+        print(f"Async rate fetch error for {base}/{quote}: {e}")
+
+    if rate is not None:
+        _rate_cache[cache_key] = (now, rate)
+        return rate
+
+    # Return stale cache if available
+    if cache_key in _rate_cache:
+        return _rate_cache[cache_key][1]
+
+    return None
+
+
+async def get_rates_bulk_async(session, base, quotes):
+    """
+    Fetch several rates sharing one base in a single Frankfurter call.
+    Quotes with a fresh cache entry are served without a request; failed
+    quotes fall back to stale cache entries when available.
+
+    Args:
+        session (aiohttp.ClientSession): Session to fetch with
+        base (str): Base currency code
+        quotes (list): Quote currency codes
+
+    Returns:
+        dict: {quote: rate} with None for quotes that could not be resolved
+    """
+    base = base.upper()
+    now = time.time()
+    rates = {}
+    missing = []
+
+    for quote in quotes:
+        quote = quote.upper()
+        cache_key = f"{base}/{quote}"
+        if cache_key in _rate_cache:
+            cached_time, cached_rate = _rate_cache[cache_key]
+            if now - cached_time < CACHE_DURATION:
+                rates[quote] = cached_rate
+                continue
+        missing.append(quote)
+
+    if missing:
+        try:
+            async with session.get(
+                FRANKFURTER_URL,
+                params={"from": base, "to": ",".join(missing)},
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+                for quote, rate in data.get('rates', {}).items():
+                    if rate is not None:
+                        _rate_cache[f"{base}/{quote}"] = (now, rate)
+                        rates[quote] = rate
+        except Exception as e:
+            print(f"Async bulk rate fetch error for {base}: {e}")
+
+    # Stale cache entries for anything still missing
+    for quote in missing:
+        if quote not in rates:
+            cache_key = f"{base}/{quote}"
+            rates[quote] = _rate_cache[cache_key][1] if cache_key in _rate_cache else None
+
+    return rates
+
+
+def make_session():
+    """Create a ClientSession with a pooled connector and DNS cache."""
+    connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def fetch_all_rates(pairs, session=None):
+    """
+    Fetch current rates for all pairs concurrently.
+
+    Args:
+        pairs (list): Pair dictionaries with 'base' and 'quote' keys
+        session (aiohttp.ClientSession): Optional session to reuse; a
+            temporary one is created (and closed) if omitted
+
+    Returns:
+        dict: {(base, quote): rate} with None for failed fetches
+    """
+    if session is None:
+        async with make_session() as session:
+            return await fetch_all_rates(pairs, session)
+
+    rate_lookup = {}
+
+    # Tier 1: pushed websocket quotes are free memory reads and the
+    # freshest source available
+    remaining = []
+    for pair in pairs:
+        base = pair['base'].upper()
+        quote = pair['quote'].upper()
+        rate = ws_client.get_live_rate(base, quote)
+        if rate is not None:
+            rate_lookup[(base, quote)] = rate
+        else:
+            remaining.append((base, quote))
+
+    # Tier 2: the sync TradingView-first bulk fetch (intraday quotes,
+    # with its own Frankfurter fallback inside) on the default executor,
+    # one task per distinct base so the groups still run concurrently
+    by_base = {}
+    for base, quote in remaining:
+        by_base.setdefault(base, []).append(quote)
+
+    if by_base:
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(None, get_rates_bulk, base, quotes)
+            for base, quotes in by_base.items()
+        ])
+        for base, fetched in zip(by_base, results):
+            for quote, rate in fetched.items():
+                rate_lookup[(base, quote)] = rate
+
+    # Tier 3: direct Frankfurter coroutines over this session for
+    # anything the sync path could not resolve (e.g. its HTTP layer is
+    # in a breaker cooldown)
+    unresolved = {}
+    for base, quotes in by_base.items():
+        missing = [q for q in quotes if rate_lookup.get((base, q)) is None]
+        if missing:
+            unresolved[base] = missing
+
+    if unresolved:
+        results = await asyncio.gather(*[
+            get_rates_bulk_async(session, base, quotes)
+            for base, quotes in unresolved.items()
+        ])
+        for base, fetched in zip(unresolved, results):
+            for quote, rate in fetched.items():
+                if rate is not None:
+                    rate_lookup[(base, quote)] = rate
+
+    return {
+        (p['base'], p['quote']): rate_lookup.get((p['base'].upper(), p['quote'].upper()))
+        for p in pairs
+    }
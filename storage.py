@@ -3,29 +3,106 @@ Storage module for Forex Watchlist application.
 Handles loading and saving watchlist data to JSON files.
 """
 
+import hashlib
 import json
+import mmap
 import os
-from datetime import datetime
+
+# orjson (Rust) parses and serializes several times faster than stdlib
+# json; fall back transparently when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 WATCHLIST_FILE = os.path.join(DATA_DIR, 'watchlist.json')
 
+# Parsed watchlist keyed by the file's mtime: unchanged files cost one
+# stat() instead of a read + JSON parse. The file stays the source of
+# truth shared with other processes - any external write bumps the mtime
+# and invalidates this cache.
+_wl_cache = {'mtime': 0, 'size': -1, 'data': None}
+
+# Files past this size are parsed straight out of a memory map instead
+# of being copied into a Python bytes object first
+MMAP_THRESHOLD = 4096
+
+_dirs_made = False
+
+
+def _ensure_data_dir():
+    """Create DATA_DIR once per process instead of per load/save."""
+    global _dirs_made
+    if not _dirs_made:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        _dirs_made = True
+
+
+# Last-written payload hash per path; saves that would rewrite identical
+# bytes return without touching the disk
+_last_hashes = {}
+
+
+def write_if_changed(path, payload):
+    """
+    Atomically write payload bytes to path, skipping unchanged content.
+
+    The bytes go to a sibling .tmp file that is fsynced and os.replace'd
+    over the target, so readers never observe a truncated file even if
+    the process dies mid-write.
+
+    Args:
+        path (str): Destination file path
+        payload (bytes): Serialized content
+
+    Returns:
+        bool: True if the file was written, False if skipped as unchanged
+    """
+    digest = hashlib.blake2b(payload, digest_size=8).digest()
+    if _last_hashes.get(path) == digest and os.path.exists(path):
+        return False
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _last_hashes[path] = digest
+    return True
+
+
+def invalidate_cache():
+    """
+    Drop the in-process watchlist cache, forcing the next load to
+    reparse from disk.
+
+    load_watchlist already revalidates with one stat() per call, so
+    external writes are picked up automatically; this is for callers
+    that replace the file out-of-band (restores, tests) and want the
+    stale parse gone immediately.
+    """
+    _wl_cache['mtime'] = 0
+    _wl_cache['size'] = -1
+    _wl_cache['data'] = None
+
 
 def get_default_watchlist():
     """Return empty watchlist structure."""
-    return {"pairs": []}
+    return {"pairs": {}}
 
 
 def load_watchlist():
     """
     Load watchlist from JSON file.
-    Creates default file if it doesn't exist.
+    Creates default file if it doesn't exist; unchanged files are served
+    from the parsed in-memory copy.
 
     Returns:
         dict: Watchlist data structure
     """
-    # Ensure data directory exists
-    os.makedirs(DATA_DIR, exist_ok=True)
+    _ensure_data_dir()
 
     if not os.path.exists(WATCHLIST_FILE):
         # Create default watchlist
@@ -33,13 +110,61 @@ def load_watchlist():
         save_watchlist(default)
         return default
 
+    st = os.stat(WATCHLIST_FILE)
+    if (st.st_mtime_ns == _wl_cache['mtime']
+            and st.st_size == _wl_cache['size']
+            and _wl_cache['data'] is not None):
+        return _wl_cache['data']
+    mtime = st.st_mtime_ns
+
     try:
-        with open(WATCHLIST_FILE, 'r') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
+        with open(WATCHLIST_FILE, 'rb') as f:
+            if os.path.getsize(WATCHLIST_FILE) > MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # The parse reads the page cache through a zero-copy
+                    # view; released before the map closes
+                    view = memoryview(mm)
+                    try:
+                        data = orjson.loads(view) if orjson else json.loads(mm[:])
+                    finally:
+                        view.release()
+            else:
+                raw = f.read()
+                data = orjson.loads(raw) if orjson else json.loads(raw)
+    except ValueError:
         # If file is corrupted, return default
         return get_default_watchlist()
 
+    # One-shot migration from the legacy list-of-pairs schema to the
+    # dict keyed by "BASE/QUOTE"; persisting it here makes every later
+    # load (and all pair lookups) take the fast path
+    if isinstance(data.get('pairs'), list):
+        data['pairs'] = {
+            f"{pair['base']}/{pair['quote']}": pair
+            for pair in data['pairs']
+        }
+        save_watchlist(data)
+        return data
+
+    _wl_cache['mtime'] = mtime
+    _wl_cache['size'] = st.st_size
+    _wl_cache['data'] = data
+    return data
+
+
+def _strip_private(watchlist):
+    """Drop underscore-prefixed decoration keys before persisting."""
+    clean = {k: v for k, v in watchlist.items() if not k.startswith('_')}
+    clean['pairs'] = {}
+    for key, pair in watchlist['pairs'].items():
+        clean_pair = {k: v for k, v in pair.items() if not k.startswith('_')}
+        clean_pair['alerts'] = [
+            {k: v for k, v in alert.items() if not k.startswith('_')}
+            for alert in pair.get('alerts', [])
+        ]
+        clean['pairs'][key] = clean_pair
+    return clean
+
 
 def save_watchlist(watchlist):
     """
@@ -48,8 +173,18 @@ def save_watchlist(watchlist):
     Args:
         watchlist (dict): Watchlist data to save
     """
-    # Ensure data directory exists
-    os.makedirs(DATA_DIR, exist_ok=True)
+    _ensure_data_dir()
+
+    clean = _strip_private(watchlist)
+    if orjson:
+        serialized = orjson.dumps(clean, option=orjson.OPT_INDENT_2)
+    else:
+        serialized = json.dumps(clean, indent=2).encode()
+    write_if_changed(WATCHLIST_FILE, serialized)
 
-    with open(WATCHLIST_FILE, 'w') as f:
-        json.dump(watchlist, f, indent=2)
+    # Keep the cache coherent with what was just written (decorations
+    # included), so the following load skips the reparse
+    st = os.stat(WATCHLIST_FILE)
+    _wl_cache['mtime'] = st.st_mtime_ns
+    _wl_cache['size'] = st.st_size
+    _wl_cache['data'] = watchlist
@@ -3,28 +3,132 @@ Watchlist module for Forex Watchlist application.
 Manages watched currency pairs and alert configurations.
 """
 
+import atexit
+import operator
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
+
+from rates import get_tradingview_symbol
 from storage import load_watchlist, save_watchlist
 
+# Comparator per alert type, resolved once per alert instead of string
+# compares on every evaluation
+ALERT_CMPS = {'above': operator.ge, 'below': operator.le}
+
+# Active ISO-4217 codes plus the metals (XAU/XAG) quoted by the rate
+# providers. A frozenset gives one hash probe per check - Python has no
+# cheaper compile-time perfect-hash construct, and membership on a
+# ~180-entry frozenset is already branch-free C
+VALID_CURRENCIES = frozenset((
+    "AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF "
+    "BMD BND BOB BRL BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC "
+    "CUP CVE CZK DJF DKK DOP DZD EGP ERN ETB EUR FJD FKP GBP GEL GHS "
+    "GIP GMD GNF GTQ GYD HKD HNL HTG HUF IDR ILS INR IQD IRR ISK JMD "
+    "JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK LBP LKR LRD LSL "
+    "LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN NAD "
+    "NGN NIO NOK NPR NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD "
+    "RUB RWF SAR SBD SCR SDG SEK SGD SHP SLE SOS SRD SSP STN SVC SYP "
+    "SZL THB TJS TMT TND TOP TRY TTD TWD TZS UAH UGX USD UYU UZS VES "
+    "VND VUV WST XAF XAG XAU XCD XOF XPF YER ZAR ZMW ZWL"
+).split())
+
+
+@lru_cache(maxsize=512)
+def _validate(code):
+    """
+    Return the uppercased, interned code, raising ValueError if
+    unrecognized.
 
-def find_pair(watchlist, base, quote):
+    Cached on the raw spelling, so repeat calls skip the case-fold and
+    set probe; results are interned to match the keys produced by
+    _key(). Failures are not cached by lru_cache, so bad codes keep
+    raising.
     """
-    Find a currency pair in the watchlist.
+    code = sys.intern(code.upper())
+    if code not in VALID_CURRENCIES:
+        raise ValueError(f"Unknown currency code: {code}")
+    return code
 
-    Args:
-        watchlist (dict): Watchlist data
-        base (str): Base currency code
-        quote (str): Quote currency code
+# Deferred-write state for batch(): 'depth' counts nested batch blocks,
+# 'pending' holds the watchlist awaiting one flush-time save
+_batch = {'depth': 0, 'pending': None}
 
-    Returns:
-        tuple: (index, pair_dict) or (None, None) if not found
+
+def _save(watchlist):
+    """
+    Persist a mutated watchlist, or defer it inside a batch() block.
+
+    Outside a batch this is save_watchlist; inside, the dict is only
+    marked dirty so N mutations cost one serialize+write at flush time.
+    Reads stay coherent without flushing: the storage cache keeps
+    returning the same in-process dict until it is written.
+    """
+    if _batch['depth']:
+        _batch['pending'] = watchlist
+    else:
+        save_watchlist(watchlist)
+
+
+def flush():
+    """Write any deferred watchlist mutations to disk."""
+    if _batch['pending'] is not None:
+        save_watchlist(_batch['pending'])
+        _batch['pending'] = None
+
+
+@contextmanager
+def batch():
+    """
+    Defer saves across a block of mutations.
+
+    with batch():
+        for base, quote, type_, target in rows:
+            add_pair_and_alert(base, quote, type_, target)
+
+    turns a scripted bulk import from one file write per mutation into a
+    single write on exit. Blocks nest; the outermost exit flushes.
     """
-    base = base.upper()
-    quote = quote.upper()
-    for i, pair in enumerate(watchlist['pairs']):
-        if pair['base'] == base and pair['quote'] == quote:
-            return i, pair
-    return None, None
+    _batch['depth'] += 1
+    try:
+        yield
+    finally:
+        _batch['depth'] -= 1
+        if _batch['depth'] == 0:
+            flush()
+
+
+# A batch abandoned by an unhandled exception still persists its last
+# consistent state at interpreter exit
+atexit.register(flush)
+
+
+def format_ts(ns):
+    """
+    Render a last_updated value for display.
+
+    update_rate stores integer epoch nanoseconds; rows last touched
+    before that change still hold ISO strings, which pass through
+    unchanged.
+    """
+    if isinstance(ns, str):
+        return ns
+    return datetime.fromtimestamp(ns / 1e9).isoformat(timespec='seconds')
+
+
+@lru_cache(maxsize=512)
+def _key(base, quote):
+    """
+    Canonical "BASE/QUOTE" key into the watchlist pairs dict.
+
+    Cached on the raw (base, quote) arguments, so repeat lookups for
+    the same spelling skip both upper() calls and the f-string build;
+    interning lets dict probes hit the identity fast path in string
+    comparison.
+    """
+    return sys.intern(f"{base.upper()}/{quote.upper()}")
 
 
 def add_pair(base, quote):
@@ -37,29 +141,74 @@ def add_pair(base, quote):
 
     Returns:
         bool: True if added, False if already exists
+
+    Raises:
+        ValueError: If either currency code is not a known ISO-4217 code
     """
     watchlist = load_watchlist()
-    base = base.upper()
-    quote = quote.upper()
+    base = _validate(base)
+    quote = _validate(quote)
 
-    # Check if pair already exists
-    _, existing = find_pair(watchlist, base, quote)
-    if existing:
+    key = _key(base, quote)
+    if key in watchlist['pairs']:
         return False
 
-    # Add new pair
-    new_pair = {
+    watchlist['pairs'][key] = {
         "base": base,
         "quote": quote,
         "alerts": [],
         "last_rate": None,
         "last_updated": None
     }
-    watchlist['pairs'].append(new_pair)
-    save_watchlist(watchlist)
+    watchlist.pop('_view', None)
+    _save(watchlist)
     return True
 
 
+def bulk_add_pairs(items):
+    """
+    Add many currency pairs with one load and one save.
+
+    A scripted import through add_pair pays a full load/save round-trip
+    per pair; this applies the whole batch against one snapshot.
+    Duplicates (within the batch or against existing pairs) are skipped.
+
+    Args:
+        items (iterable): (base, quote) tuples
+
+    Returns:
+        int: Number of pairs actually added
+
+    Raises:
+        ValueError: If any currency code is not a known ISO-4217 code
+    """
+    watchlist = load_watchlist()
+    pairs = watchlist['pairs']
+
+    # Validate the whole batch before touching the snapshot: it is the
+    # same cached dict every caller sees, so a mid-loop ValueError must
+    # not leave half the batch staged for the next unrelated save
+    new_pairs = {}
+    for base, quote in items:
+        base = _validate(base)
+        quote = _validate(quote)
+        key = _key(base, quote)
+        if key not in pairs and key not in new_pairs:
+            new_pairs[key] = {
+                "base": base,
+                "quote": quote,
+                "alerts": [],
+                "last_rate": None,
+                "last_updated": None
+            }
+
+    if new_pairs:
+        pairs.update(new_pairs)
+        watchlist.pop('_view', None)
+        _save(watchlist)
+    return len(new_pairs)
+
+
 def remove_pair(base, quote):
     """
     Remove a currency pair from the watchlist.
@@ -72,13 +221,12 @@ def remove_pair(base, quote):
         bool: True if removed, False if not found
     """
     watchlist = load_watchlist()
-    idx, _ = find_pair(watchlist, base, quote)
-
-    if idx is None:
+    if watchlist['pairs'].pop(_key(base, quote), None) is None:
         return False
 
-    watchlist['pairs'].pop(idx)
-    save_watchlist(watchlist)
+    watchlist.pop('_soa', None)
+    watchlist.pop('_view', None)
+    _save(watchlist)
     return True
 
 
@@ -95,23 +243,86 @@ def add_alert(base, quote, alert_type, target, note=""):
 
     Returns:
         bool: True if added, False if pair not found
+
+    Raises:
+        ValueError: If alert_type is not 'above' or 'below'
     """
+    alert_type = alert_type.lower()
+    if alert_type not in ALERT_CMPS:
+        raise ValueError(f"Unknown alert type: {alert_type}")
+
     watchlist = load_watchlist()
-    idx, pair = find_pair(watchlist, base, quote)
+    pair = watchlist['pairs'].get(_key(base, quote))
 
     if pair is None:
         return False
 
-    alert = {
-        "type": alert_type.lower(),
+    pair['alerts'].append({
+        "type": alert_type,
         "target": float(target),
         "note": note
-    }
-    watchlist['pairs'][idx]['alerts'].append(alert)
-    save_watchlist(watchlist)
+    })
+    pair.pop('_sorted', None)
+    watchlist.pop('_soa', None)
+    watchlist.pop('_view', None)
+    _save(watchlist)
     return True
 
 
+def add_pair_and_alert(base, quote, alert_type, target, note=""):
+    """
+    Add an alert, creating the pair first if needed, in one load/save.
+
+    The CLI 'alert' command previously did this as separate list/add/alert
+    calls, costing up to three reads and two writes of the watchlist file.
+
+    Args:
+        base (str): Base currency code
+        quote (str): Quote currency code
+        alert_type (str): 'above' or 'below'
+        target (float): Target price
+        note (str): Optional note for the alert
+
+    Returns:
+        bool: True if the pair was newly added, False if it already existed
+
+    Raises:
+        ValueError: If either currency code is not a known ISO-4217 code,
+            or alert_type is not 'above' or 'below'
+    """
+    alert_type = alert_type.lower()
+    if alert_type not in ALERT_CMPS:
+        raise ValueError(f"Unknown alert type: {alert_type}")
+
+    watchlist = load_watchlist()
+    base = _validate(base)
+    quote = _validate(quote)
+
+    key = _key(base, quote)
+    pair = watchlist['pairs'].get(key)
+    added = pair is None
+    if added:
+        pair = {
+            "base": base,
+            "quote": quote,
+            "alerts": [],
+            "last_rate": None,
+            "last_updated": None
+        }
+        watchlist['pairs'][key] = pair
+
+    pair['alerts'].append({
+        "type": alert_type,
+        "target": float(target),
+        "note": note
+    })
+    pair.pop('_sorted', None)
+    watchlist.pop('_soa', None)
+    watchlist.pop('_view', None)
+    _save(watchlist)
+    return added
+
+
 def remove_alert(base, quote, alert_index):
     """
     Remove an alert from a currency pair by index.
@@ -125,7 +336,7 @@ def remove_alert(base, quote, alert_index):
         bool: True if removed, False if not found
     """
     watchlist = load_watchlist()
-    idx, pair = find_pair(watchlist, base, quote)
+    pair = watchlist['pairs'].get(_key(base, quote))
 
     if pair is None:
         return False
@@ -133,8 +344,11 @@ def remove_alert(base, quote, alert_index):
     if alert_index < 0 or alert_index >= len(pair['alerts']):
         return False
 
-    watchlist['pairs'][idx]['alerts'].pop(alert_index)
-    save_watchlist(watchlist)
+    pair['alerts'].pop(alert_index)
+    pair.pop('_sorted', None)
+    watchlist.pop('_soa', None)
+    watchlist.pop('_view', None)
+    _save(watchlist)
     return True
 
 
@@ -142,11 +356,114 @@ def list_pairs():
     """
     Get all watched currency pairs.
 
+    Each pair is decorated with display helpers computed once per load:
+    '_name' ("EUR/USD") and '_tv' (the TradingView symbol), so render
+    loops don't rebuild them per use. Underscore-prefixed keys are
+    stripped again before the watchlist is written to disk.
+
+    The returned list is a cached view shared across calls on the same
+    watchlist snapshot - treat it as read-only and use
+    list_pairs_copy() when an independent list is needed.
+
     Returns:
         list: List of pair dictionaries
     """
     watchlist = load_watchlist()
-    return watchlist['pairs']
+    view = watchlist.get('_view')
+    if view is None:
+        for pair in watchlist['pairs'].values():
+            if '_name' not in pair:
+                pair['_name'] = f"{pair['base']}/{pair['quote']}"
+                pair['_tv'] = get_tradingview_symbol(pair['base'], pair['quote'])
+            for alert in pair['alerts']:
+                if '_cmp' not in alert:
+                    alert['_cmp'] = ALERT_CMPS.get(alert['type'])
+                    # Notification strings whose content never changes
+                    # between ticks, formatted once instead of per check
+                    alert['_title'] = f"Forex Alert: {pair['_name']}"
+                    alert['_prefix'] = f"Price is now {alert['type']} {alert['target']:.5f}"
+        view = list(watchlist['pairs'].values())
+        watchlist['_view'] = view
+    return view
+
+
+def list_pairs_copy():
+    """Independent (shallow) copy of list_pairs() for callers that
+    reorder or filter in place; the pair dicts are still shared."""
+    return list(list_pairs())
+
+
+def alert_soa():
+    """
+    Cached struct-of-arrays view (AlertIndex) over the current watchlist.
+
+    The index flattens every alert's targets into NumPy arrays once per
+    loaded snapshot, stored under the '_soa' decoration key; mutators
+    that touch alerts drop the key, so steady-state monitor ticks reuse
+    the arrays instead of rebuilding them.
+    """
+    # Imported here so CLI paths that never evaluate alerts skip the
+    # NumPy import
+    from alerts_index import AlertIndex
+
+    watchlist = load_watchlist()
+    index = watchlist.get('_soa')
+    if index is None:
+        index = AlertIndex(watchlist['pairs'].values())
+        watchlist['_soa'] = index
+    return index
+
+
+def get_alert_index():
+    """
+    Build a {(base, quote): alerts} index over pairs that have alerts.
+
+    The index is derived per call from the stored watchlist (the file is
+    the source of truth shared with the monitor process), so it never
+    goes stale; pairs without alerts are skipped entirely.
+
+    Returns:
+        dict: {(base, quote): list of alert dicts}
+    """
+    return {
+        (pair['base'], pair['quote']): pair['alerts']
+        for pair in list_pairs() if pair['alerts']
+    }
+
+
+def count_alerts():
+    """Total number of alerts across the watchlist."""
+    return sum(map(len, get_alert_index().values()))
+
+
+def update_rates(rates):
+    """
+    Update the last known rates for many pairs with one load and save.
+
+    A check cycle that fetched N pairs previously paid N full
+    serialize+write round-trips through update_rate; this applies the
+    whole mapping against one loaded snapshot. Unknown pairs are
+    ignored.
+
+    Args:
+        rates (dict): {(base, quote): rate}
+    """
+    watchlist = load_watchlist()
+    # An int write beats building and formatting a datetime on the
+    # per-tick path; format_ts renders it when displayed
+    now = time.time_ns()
+    changed = False
+    for (base, quote), rate in rates.items():
+        pair = watchlist['pairs'].get(_key(base, quote))
+        # Consecutive FX ticks are frequently identical; skipping them
+        # saves the whole serialize+write when nothing moved
+        if pair is not None and pair.get('last_rate') != rate:
+            pair['last_rate'] = rate
+            pair['last_updated'] = now
+            changed = True
+
+    if changed:
+        _save(watchlist)
 
 
 def update_rate(base, quote, rate):
@@ -158,10 +475,4 @@ def update_rate(base, quote, rate):
         quote (str): Quote currency code
         rate (float): Current rate
     """
-    watchlist = load_watchlist()
-    idx, pair = find_pair(watchlist, base, quote)
-
-    if pair is not None:
-        watchlist['pairs'][idx]['last_rate'] = rate
-        watchlist['pairs'][idx]['last_updated'] = datetime.now().isoformat()
-        save_watchlist(watchlist)
+    update_rates({(base, quote): rate})
@@ -0,0 +1,162 @@
+"""
+Optional TradingView websocket quote stream for Forex Watchlist.
+Keeps a persistent quote session that pushes tick updates into an
+in-memory dict, so rate reads become memory lookups instead of per-call
+HTTP polls. Requires the optional 'websockets' package; everything falls
+back to the HTTP path in rates.py when it is missing or the stream is
+down.
+"""
+
+import json
+import random
+import re
+import string
+import threading
+import time
+
+try:
+    from websockets.sync.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+from rates import get_symbol
+
+WS_URL = "wss://data.tradingview.com/socket.io/websocket"
+WS_ORIGIN = "https://www.tradingview.com"
+
+# Pushed quotes older than this are treated as stale and ignored
+LIVE_TTL = 60  # seconds
+
+# {"OANDA:EURUSD": (received_at, price)} - written by the stream thread,
+# read by get_live_rate; dict assignment is atomic under the GIL
+_live = {}
+_symbols = set()
+_symbols_lock = threading.Lock()
+_stop = threading.Event()
+_thread = None
+
+# TradingView frames messages as ~m~<len>~m~<json>
+_FRAME_RE = re.compile(r"~m~\d+~m~")
+
+
+def is_available():
+    """True if the optional websockets dependency is installed."""
+    return ws_connect is not None
+
+
+def _frame(payload):
+    message = json.dumps(payload, separators=(',', ':'))
+    return f"~m~{len(message)}~m~{message}"
+
+
+def _send(conn, method, params):
+    conn.send(_frame({"m": method, "p": params}))
+
+
+def _handle_frames(raw):
+    """
+    Process one websocket message; store any quote updates.
+
+    Returns:
+        str: Heartbeat token to echo back, or None
+    """
+    heartbeat = None
+    for part in _FRAME_RE.split(raw):
+        if not part:
+            continue
+        if part.startswith("~h~"):
+            heartbeat = part
+            continue
+        try:
+            message = json.loads(part)
+        except ValueError:
+            continue
+        if message.get("m") == "qsd":
+            data = message["p"][1]
+            symbol = data.get("n")
+            price = (data.get("v") or {}).get("lp")
+            if symbol and price is not None:
+                _live[symbol] = (time.time(), price)
+    return heartbeat
+
+
+def _run():
+    """Stream loop: connect, subscribe, then reconnect with backoff."""
+    session_id = "qs_" + "".join(random.choices(string.ascii_lowercase, k=12))
+    backoff = 1
+
+    while not _stop.is_set():
+        try:
+            with ws_connect(WS_URL, origin=WS_ORIGIN) as conn:
+                _send(conn, "set_auth_token", ["unauthorized_user_token"])
+                _send(conn, "quote_create_session", [session_id])
+                with _symbols_lock:
+                    subscribed = list(_symbols)
+                if subscribed:
+                    _send(conn, "quote_add_symbols", [session_id] + subscribed)
+                backoff = 1
+
+                while not _stop.is_set():
+                    raw = conn.recv(timeout=30)
+                    heartbeat = _handle_frames(raw)
+                    if heartbeat:
+                        conn.send(f"~m~{len(heartbeat)}~m~{heartbeat}")
+
+                    # Pick up symbols added after connect
+                    with _symbols_lock:
+                        new = [s for s in _symbols if s not in subscribed]
+                    if new:
+                        _send(conn, "quote_add_symbols", [session_id] + new)
+                        subscribed.extend(new)
+        except Exception:
+            # Reconnect with capped exponential backoff + jitter
+            _stop.wait(min(60, backoff) + random.random())
+            backoff *= 2
+
+
+def start_stream(pairs):
+    """
+    Subscribe to the given pairs and start the stream thread (idempotent).
+
+    Args:
+        pairs (list): Pair dictionaries with 'base' and 'quote' keys
+
+    Returns:
+        bool: True if the stream is running
+    """
+    global _thread
+    if not is_available():
+        return False
+
+    with _symbols_lock:
+        for pair in pairs:
+            symbol = get_symbol(pair['base'], pair['quote'])
+            if symbol:
+                _symbols.add(f"OANDA:{symbol}")
+
+    if _thread is None or not _thread.is_alive():
+        _stop.clear()
+        _thread = threading.Thread(target=_run, daemon=True, name="tv-stream")
+        _thread.start()
+    return True
+
+
+def stop_stream():
+    """Signal the stream thread to shut down."""
+    _stop.set()
+
+
+def get_live_rate(base, quote):
+    """
+    Read the latest pushed rate for a pair from memory.
+
+    Returns:
+        float: Rate, or None if the stream has no fresh quote
+    """
+    symbol = get_symbol(base, quote)
+    if not symbol:
+        return None
+    entry = _live.get(f"OANDA:{symbol}")
+    if entry and time.time() - entry[0] < LIVE_TTL:
+        return entry[1]
+    return None